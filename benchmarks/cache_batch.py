@@ -0,0 +1,79 @@
+"""
+AsyncBunnyCache 单 key 操作与批量操作的 Redis 往返次数对比
+
+- token: 开启 SSO 时 BunnyToken.verify 读取黑名单和 SSO 标识
+- read: 读取 5 个 key，其中 3 个命中内存
+- write: 写入 5 个 key
+
+运行: python benchmarks/cache_batch.py
+"""
+
+import asyncio
+import time
+
+from common import FakeAsyncRedis, report, run_load
+
+from bunny_api.cache import AsyncBunnyCache
+
+TOTAL = 2000
+RATE = 2000
+LATENCY = 0.001
+
+TOKEN_KEYS = ['bunny:token:blacklist:bench', 'bunny:token:1']
+READ_KEYS = [f'bench:read:{i}' for i in range(5)]
+WRITE_KEYS = [f'bench:write:{i}' for i in range(5)]
+
+
+async def main() -> None:
+    redis = FakeAsyncRedis(LATENCY)
+    cache = AsyncBunnyCache(redis)
+
+    await cache.set_redis('bunny:token:1', 'sso')
+    await cache.set_many({key: key for key in READ_KEYS})
+    for key in READ_KEYS[3:]:
+        cache.delete_memory(key)
+
+    async def token_single() -> None:
+        for key in TOKEN_KEYS:
+            await cache.get_redis(key)
+
+    async def token_batch() -> None:
+        await cache.get_many_redis(TOKEN_KEYS)
+
+    async def read_single() -> None:
+        for key in READ_KEYS:
+            await cache.get(key)
+            if key in READ_KEYS[3:]:
+                cache.delete_memory(key)
+
+    async def read_batch() -> None:
+        await cache.get_many(READ_KEYS)
+        for key in READ_KEYS[3:]:
+            cache.delete_memory(key)
+
+    async def write_single() -> None:
+        for key in WRITE_KEYS:
+            await cache.set(key, key, 60)
+
+    async def write_batch() -> None:
+        await cache.set_many({key: key for key in WRITE_KEYS}, 60)
+
+    print(f'requests={TOTAL} rate={RATE}/s redis_latency={LATENCY * 1000}ms')
+
+    for name, handler in (
+        ('token get_redis x2', token_single),
+        ('token get_many_redis', token_batch),
+        ('read get x5', read_single),
+        ('read get_many', read_batch),
+        ('write set x5', write_single),
+        ('write set_many', write_batch),
+    ):
+        calls = redis.calls
+        start = time.perf_counter()
+        latencies = await run_load(handler, TOTAL, RATE)
+        report(name, latencies, time.perf_counter() - start)
+        print(f'{"":<24} round_trips/request={(redis.calls - calls) / TOTAL:.2f}')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,42 @@
+"""
+同步 BunnyCache 与异步 AsyncBunnyCache 在并发请求下的 p99 延迟对比
+
+模拟开启 SSO 时 BunnyToken.verify 的两次 Redis 读取（黑名单 + SSO 标识）
+
+运行: python benchmarks/cache_latency.py
+"""
+
+import asyncio
+import time
+
+from common import FakeAsyncRedis, FakeRedis, report, run_load
+
+from bunny_api.cache import AsyncBunnyCache, BunnyCache
+
+TOTAL = 2000
+RATE = 1000
+LATENCY = 0.001
+
+
+async def main() -> None:
+    sync_cache = BunnyCache(FakeRedis(LATENCY))
+    async_cache = AsyncBunnyCache(FakeAsyncRedis(LATENCY))
+
+    async def sync_handler() -> None:
+        sync_cache.get_redis('bunny:token:blacklist:bench')
+        sync_cache.get_redis('bunny:token:1')
+
+    async def async_handler() -> None:
+        await async_cache.get_redis('bunny:token:blacklist:bench')
+        await async_cache.get_redis('bunny:token:1')
+
+    print(f'requests={TOTAL} rate={RATE}/s redis_latency={LATENCY * 1000}ms')
+
+    for name, handler in (('BunnyCache (sync)', sync_handler), ('AsyncBunnyCache', async_handler)):
+        start = time.perf_counter()
+        latencies = await run_load(handler, TOTAL, RATE)
+        report(name, latencies, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
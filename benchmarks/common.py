@@ -0,0 +1,195 @@
+"""
+基准测试公共工具
+
+提供本地 Fake Redis（模拟固定网络延迟）以及延迟统计函数，
+导入前会补齐 BunnyConfig 必填的环境变量，无需真实的数据库和 Redis。
+"""
+
+import asyncio
+import os
+import sys
+import time
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+for _key, _value in {
+    'DB_HOST': 'localhost',
+    'DB_PORT': '3306',
+    'DB_USER': 'bench',
+    'DB_PASSWORD': 'bench',
+    'DB_NAME': 'bench',
+    'ADMIN_TOKEN_SECRET_KEY': 'bench-secret',
+}.items():
+    os.environ.setdefault(_key, _value)
+
+
+class FakeRedis:
+    """同步 Fake Redis，每次调用阻塞 latency 秒以模拟一次网络往返"""
+
+    def __init__(self, latency: float = 0.001):
+        self.latency = latency
+        self.data: Dict[str, bytes] = {}
+        self.calls = 0
+
+    def _round_trip(self) -> None:
+        self.calls += 1
+        time.sleep(self.latency)
+
+    def get(self, key: str) -> Optional[bytes]:
+        self._round_trip()
+        return self.data.get(key)
+
+    def set(self, key: str, value: bytes) -> None:
+        self._round_trip()
+        self.data[key] = value
+
+    def setex(self, key: str, ttl: int, value: bytes) -> None:
+        self._round_trip()
+        self.data[key] = value
+
+    def delete(self, *keys: str) -> None:
+        self._round_trip()
+        for key in keys:
+            self.data.pop(key, None)
+
+
+class FakeAsyncRedis:
+    """异步 Fake Redis，每次调用让出事件循环 latency 秒以模拟一次网络往返"""
+
+    def __init__(self, latency: float = 0.001):
+        self.latency = latency
+        self.data: Dict[str, bytes] = {}
+        self.calls = 0
+
+    async def _round_trip(self) -> None:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        await self._round_trip()
+        return self.data.get(key)
+
+    async def set(
+        self, key: str, value: bytes, nx: bool = False, px: Optional[int] = None
+    ) -> Optional[bool]:
+        await self._round_trip()
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def setex(self, key: str, ttl: int, value: bytes) -> None:
+        await self._round_trip()
+        self.data[key] = value
+
+    async def delete(self, *keys: str) -> None:
+        await self._round_trip()
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def eval(self, script: str, numkeys: int, key: str, token: str) -> int:
+        # 仅支持释放锁的脚本：值与 token 一致时删除
+        await self._round_trip()
+        if self.data.get(key) != token:
+            return 0
+        del self.data[key]
+        return 1
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        await self._round_trip()
+        return [self.data.get(key) for key in keys]
+
+    async def scan(
+        self, cursor: int = 0, match: Optional[str] = None, count: Optional[int] = None
+    ) -> Tuple[int, List[str]]:
+        await self._round_trip()
+        return 0, [key for key in self.data if match is None or fnmatch(key, match)]
+
+    def pipeline(self, transaction: bool = True) -> 'FakeAsyncPipeline':
+        return FakeAsyncPipeline(self)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class FakeAsyncPipeline:
+    """FakeAsyncRedis 的 pipeline，execute 时只计一次网络往返"""
+
+    def __init__(self, redis: FakeAsyncRedis):
+        self.redis = redis
+        self.commands: List[Any] = []
+
+    async def __aenter__(self) -> 'FakeAsyncPipeline':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self.commands.clear()
+
+    def get(self, key: str) -> None:
+        self.commands.append(lambda data: data.get(key))
+
+    def mget(self, keys: List[str]) -> None:
+        self.commands.append(lambda data: [data.get(key) for key in keys])
+
+    def pttl(self, key: str) -> None:
+        self.commands.append(lambda data: -1 if key in data else -2)
+
+    def set(self, key: str, value: bytes) -> None:
+        self.commands.append(lambda data: data.__setitem__(key, value))
+
+    def setex(self, key: str, ttl: int, value: bytes) -> None:
+        self.set(key, value)
+
+    def delete(self, key: str) -> None:
+        self.commands.append(lambda data: data.pop(key, None))
+
+    async def execute(self) -> List[Any]:
+        await self.redis._round_trip()
+        results = [command(self.redis.data) for command in self.commands]
+        self.commands.clear()
+        return results
+
+
+def percentile(values: List[float], p: float) -> float:
+    """计算百分位数"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_load(handler, total: int, rate: float) -> List[float]:
+    """
+    以固定到达速率（开环）发起请求，返回每个请求从到达到完成的耗时（秒）
+
+    阻塞事件循环的实现会让后续请求排队，排队时间同样计入延迟
+
+    Args:
+        handler: 无参数的异步函数
+        total: 总请求数
+        rate: 每秒到达的请求数
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    latencies: List[float] = []
+
+    async def one(arrival: float) -> Any:
+        await asyncio.sleep(max(0.0, arrival - loop.time()))
+        await handler()
+        latencies.append(loop.time() - arrival)
+
+    await asyncio.gather(*(one(start + i / rate) for i in range(total)))
+
+    return latencies
+
+
+def report(name: str, latencies: List[float], elapsed: float) -> None:
+    """输出延迟统计"""
+    print(
+        f'{name:<24} '
+        f'p50={percentile(latencies, 50) * 1000:8.2f}ms '
+        f'p99={percentile(latencies, 99) * 1000:8.2f}ms '
+        f'rps={len(latencies) / elapsed:10.1f}'
+    )
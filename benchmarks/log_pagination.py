@@ -0,0 +1,109 @@
+"""
+操作日志分页：页码分页与游标分页对比
+
+- 在 SQLite 临时文件中生成 ROWS 条 bunny_operation_logs
+- offset: paginate 按页码分页，OFFSET 需要跳过之前的所有行
+- cursor: paginate 按 id 倒序游标分页，从上一页最后一行的 id 开始查询
+- query 只统计取一页数据的查询，paginate 还包含一次 count 查询
+- count=none: 游标分页且不计算总数，只返回 has_more
+
+运行: python benchmarks/log_pagination.py
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+import common  # noqa: F401
+from tortoise import Tortoise
+
+from bunny_api.models.bunny import BunnyOperationLog
+from bunny_api.utils import encode_cursor, paginate
+
+ROWS = 2000000
+LIMIT = 20
+PAGES = [1, 100, 1000, 10000, 50000, 99000]
+REPEAT = 5
+
+
+async def generate() -> None:
+    conn = Tortoise.get_connection('default')
+    await conn.execute_script(
+        f"""
+        WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < {ROWS})
+        INSERT INTO bunny_operation_logs
+            (created_at, user_id, username, nickname, path, route, method, ip, content, is_success)
+        SELECT
+            datetime('2026-01-01', '+' || (n / 10) || ' seconds'),
+            n % 100, 'admin', 'Admin', '/admin/role', 'role.update', 'PUT', '127.0.0.1',
+            '{{"name": "role"}}', 1
+        FROM seq
+        """
+    )
+
+
+async def timed(func) -> float:
+    await func()
+
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        await func()
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+
+async def main() -> None:
+    path = os.path.join(tempfile.mkdtemp(), 'logs.sqlite3')
+    await Tortoise.init(db_url=f'sqlite://{path}', modules={'models': ['bunny_api.models.bunny']})
+    await Tortoise.generate_schemas()
+
+    start = time.perf_counter()
+    await generate()
+    print(f'rows={ROWS} limit={LIMIT} generate: {time.perf_counter() - start:.1f}s')
+
+    count = await timed(lambda: BunnyOperationLog.all().count())
+    print(f'count: {count:.1f}ms')
+
+    for page in PAGES:
+        # 游标分页从上一页的最后一行开始，与页码分页返回相同的数据
+        last_id = ROWS - (page - 1) * LIMIT + 1
+        cursor = encode_cursor(['-id'], {'id': last_id}, False) if page > 1 else None
+
+        offset_query = await timed(
+            lambda: (
+                BunnyOperationLog.all()
+                .order_by('-id')
+                .offset((page - 1) * LIMIT)
+                .limit(LIMIT)
+                .values_list('id', flat=True)
+            )
+        )
+        cursor_query = await timed(
+            lambda: (
+                BunnyOperationLog.filter(id__lt=last_id)
+                .order_by('-id')
+                .limit(LIMIT + 1)
+                .values_list('id', flat=True)
+            )
+        )
+        offset = await timed(lambda: paginate(BunnyOperationLog, page, LIMIT, order_by='-id'))
+        keyset = await timed(
+            lambda: paginate(BunnyOperationLog, page, LIMIT, keyset=['-id'], cursor=cursor)
+        )
+        no_count = await timed(
+            lambda: paginate(
+                BunnyOperationLog, page, LIMIT, keyset=['-id'], cursor=cursor, count='none'
+            )
+        )
+        print(
+            f'page {page:>6}  query: offset {offset_query:7.2f}ms cursor {cursor_query:5.2f}ms  '
+            f'paginate: offset {offset:7.1f}ms cursor {keyset:6.1f}ms '
+            f'cursor count=none {no_count:5.2f}ms'
+        )
+
+    await Tortoise.close_connections()
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+"""
+操作日志中间件吞吐量对比
+
+- none: 不使用中间件
+- BaseHTTPMiddleware: 原来基于 BaseHTTPMiddleware 的 operation_log
+- ASGI: 纯 ASGI 实现的 OperationLogMiddleware，日志直接写入数据库
+- ASGI + queue: 日志放入 operation_log_queue，后台批量写入
+
+请求直接调用 ASGI 应用，不经过网络；记录日志的 POST 写入 SQLite 内存数据库
+
+运行: python benchmarks/operation_log.py
+"""
+
+import asyncio
+import json
+import time
+
+import common  # noqa: F401
+from fastapi import Depends, FastAPI
+from fastapi.responses import StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+from tortoise import Tortoise
+
+from bunny_api.log_queue import operation_log_queue
+from bunny_api.middlewares import OperationLogMiddleware, operation_log, set_log_body
+
+TOTAL = 5000
+
+
+class BaseHTTPOperationLogMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        return await operation_log(request, call_next)
+
+
+def create_app(middleware: type | None) -> FastAPI:
+    app = FastAPI()
+
+    @app.get('/ping', name='ping')
+    async def ping() -> dict:
+        return {'code': 0}
+
+    @app.get('/stream', name='stream')
+    async def stream() -> StreamingResponse:
+        async def chunks():
+            for _ in range(10):
+                yield b'x' * 1024
+
+        return StreamingResponse(chunks())
+
+    @app.post('/echo', name='echo', dependencies=[Depends(set_log_body)])
+    async def echo() -> dict:
+        return {'code': 0}
+
+    if middleware is not None:
+        app.add_middleware(middleware)
+
+    return app
+
+
+async def request(app: FastAPI, method: str, path: str, body: bytes = b'') -> None:
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'bench'), (b'content-type', b'application/json')],
+        'client': ('127.0.0.1', 10000),
+        'server': ('bench', 80),
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+
+    async def receive() -> dict:
+        if messages:
+            return messages.pop()
+        await asyncio.sleep(3600)
+
+    async def send(message: dict) -> None:
+        pass
+
+    await app(scope, receive, send)
+
+
+async def bench(name: str, middleware: type | None) -> None:
+    app = create_app(middleware)
+    body = json.dumps({'name': 'bench'}).encode()
+    results = []
+
+    for label, method, path in [
+        ('GET', 'GET', '/ping'),
+        ('GET stream', 'GET', '/stream'),
+        ('POST logged', 'POST', '/echo'),
+    ]:
+        for _ in range(100):
+            await request(app, method, path, body)
+
+        start = time.perf_counter()
+        for _ in range(TOTAL):
+            await request(app, method, path, body)
+        results.append(f'{label}={TOTAL / (time.perf_counter() - start):8.1f}')
+
+    print(f'{name:<20} req/s ' + ' '.join(results))
+
+
+async def main() -> None:
+    await Tortoise.init(db_url='sqlite://:memory:', modules={'models': ['bunny_api.models.bunny']})
+    await Tortoise.generate_schemas()
+
+    print(f'requests={TOTAL}')
+    await bench('none', None)
+    await bench('BaseHTTPMiddleware', BaseHTTPOperationLogMiddleware)
+    await bench('ASGI', OperationLogMiddleware)
+
+    operation_log_queue.spill_path = ''
+    await operation_log_queue.start()
+    await bench('ASGI + queue', OperationLogMiddleware)
+    await operation_log_queue.close()
+
+    await Tortoise.close_connections()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+"""
+RBAC 快照的内存占用和吞吐量
+
+- 100000 个用户，1000 个角色，500 个权限，每个角色 30 个权限，每个用户 1-3 个角色
+- list scan: 每个用户缓存权限字符串列表，检查时线性查找，对应快照之前内存命中时的开销
+- invalidate_role: 从 SQLite 内存数据库重新读取单个角色的权限
+
+运行: python benchmarks/rbac_snapshot.py
+"""
+
+import asyncio
+import random
+import sys
+import time
+import tracemalloc
+
+from common import FakeAsyncRedis
+from tortoise import Tortoise
+
+from bunny_api.cache import AsyncBunnyCache
+from bunny_api.models.bunny import BunnyMenu, BunnyRolePermission
+from bunny_api.rbac import RBAC
+
+USERS = 100000
+ROLES = 1000
+PERMISSIONS = 500
+ROLE_PERMISSIONS = 30
+TOTAL = 200000
+
+
+def generate() -> tuple[list[BunnyMenu], list[tuple[int, str]], list[tuple[int, int]]]:
+    random.seed(0)
+
+    menus = [
+        BunnyMenu(
+            id=i + 1,
+            parent_id=0,
+            title=f'menu {i}',
+            path=f'/menu-{i}',
+            permission=f'module{i // 10}.action{i % 10}',
+            sort=i % 7,
+            hidden=i % 5 == 0,
+        )
+        for i in range(PERMISSIONS)
+    ]
+    names = [menu.permission for menu in menus]
+
+    role_permissions = [
+        (role_id, permission)
+        for role_id in range(1, ROLES + 1)
+        for permission in random.sample(names, ROLE_PERMISSIONS)
+    ]
+    user_roles = [
+        (user_id, role_id)
+        for user_id in range(2, USERS + 2)
+        for role_id in random.sample(range(1, ROLES + 1), random.randint(1, 3))
+    ]
+
+    return menus, role_permissions, user_roles
+
+
+def bench(name: str, func, total: int = TOTAL) -> None:
+    start = time.perf_counter()
+    for i in range(total):
+        func(i)
+    elapsed = time.perf_counter() - start
+    print(f'{name:<28} {total / elapsed:12.1f} ops/s {elapsed / total * 1e6:8.2f}us/op')
+
+
+async def main() -> None:
+    menus, role_permissions, user_roles = generate()
+    rbac = RBAC(AsyncBunnyCache(FakeAsyncRedis(0)))
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    rbac.build(menus, role_permissions, user_roles)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # 与快照相同的数据，每个用户缓存一份权限字符串列表
+    lists = {user_id: list(rbac.get_permissions(user_id)) for user_id in rbac.user_roles}
+    list_bytes = sys.getsizeof(lists) + sum(sys.getsizeof(value) for value in lists.values())
+
+    print(f'users={USERS} roles={ROLES} permissions={PERMISSIONS}')
+    print(f'build: {elapsed * 1000:.1f}ms, peak memory {peak / 1024 / 1024:.1f}MiB')
+    print(f'per-user permission lists: {list_bytes / 1024 / 1024:.1f}MiB')
+
+    names = list(rbac.registry.ids)
+    user_ids = list(rbac.user_roles)
+    checks = [(random.choice(user_ids), random.choice(names)) for _ in range(1000)]
+    required = [random.sample(names, 5) for _ in range(1000)]
+
+    bench(
+        'check (snapshot)',
+        lambda i: checks[i % 1000][1] in rbac.get_permissions(checks[i % 1000][0]),
+    )
+    bench('check (list scan)', lambda i: checks[i % 1000][1] in lists[checks[i % 1000][0]])
+    bench(
+        'has_all x5 (snapshot)',
+        lambda i: rbac.get_permissions(checks[i % 1000][0]).has_all(required[i % 1000]),
+    )
+    bench('get_menus', lambda i: rbac.get_menus(checks[i % 1000][0]), 20000)
+
+    # 单个角色失效只重新读取该角色的权限，使用 SQLite 内存数据库
+    await Tortoise.init(db_url='sqlite://:memory:', modules={'models': ['bunny_api.models.bunny']})
+    await Tortoise.generate_schemas()
+    await BunnyRolePermission.bulk_create(
+        [BunnyRolePermission(role_id=r, permission=p) for r, p in role_permissions if r <= 100]
+    )
+
+    start = time.perf_counter()
+    for role_id in range(1, 101):
+        await rbac.invalidate_role(role_id)
+    print(f'invalidate_role: {(time.perf_counter() - start) / 100 * 1e6:.1f}us/op')
+
+    await Tortoise.close_connections()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+"""
+BunnyToken.verify 吞吐量对比
+
+- payload cache: 缓存已验证的 token 载荷，跳过签名校验和声明解析
+- bloom filter: 撤销记录布隆过滤器，判断用户没有撤销记录时跳过 Redis 查询
+
+关闭了负缓存，Redis 往返次数反映撤销记录查询的次数
+
+运行: python benchmarks/token_verify.py
+"""
+
+import asyncio
+import time
+
+from common import FakeAsyncRedis
+
+from bunny_api.cache import AsyncBunnyCache
+from bunny_api.token import BunnyToken
+
+TOTAL = 50000
+TOKENS = 100
+SECRET = 'bench-secret-with-at-least-32-bytes'
+
+
+async def bench(name: str, cache_size: int, revocation_capacity: int) -> None:
+    redis = FakeAsyncRedis(0)
+    bunny_token = BunnyToken(
+        SECRET,
+        cache_size=cache_size,
+        revocation_capacity=revocation_capacity,
+        cache=AsyncBunnyCache(redis),
+    )
+    tokens = [await bunny_token.generate(user_id) for user_id in range(1, TOKENS + 1)]
+    await bunny_token.ban(await bunny_token.generate(0))
+    await bunny_token.revoke_all(TOKENS + 1)
+    await bunny_token.start()
+
+    # 预热，让已验证的载荷进入内存
+    for token in tokens:
+        await bunny_token.verify(token)
+
+    calls = redis.calls
+    start = time.perf_counter()
+    for i in range(TOTAL):
+        await bunny_token.verify(tokens[i % TOKENS])
+    elapsed = time.perf_counter() - start
+
+    print(
+        f'{name:<28} {TOTAL / elapsed:10.1f} verify/s {elapsed / TOTAL * 1e6:8.2f}us/op '
+        f'round_trips/verify={(redis.calls - calls) / TOTAL:.2f}'
+    )
+
+
+async def main() -> None:
+    print(f'verify={TOTAL} tokens={TOKENS}')
+    await bench('baseline', 0, 0)
+    await bench('payload cache', 10000, 0)
+    await bench('payload cache + bloom filter', 10000, 100000)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
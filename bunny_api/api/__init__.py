@@ -1,6 +1,7 @@
-from .admin import adminRouter, adminRouterWithAuth
+from .admin import adminRouter, adminRouterWithAuth, metricsRouter
 
 __all__ = [
     'adminRouter',
     'adminRouterWithAuth',
+    'metricsRouter',
 ]
@@ -1,19 +1,25 @@
+import os
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 
-from ..middlewares import permission_check, set_log_body, verify_token
+from ..cache import async_bunny_cache, cache_metrics
+from ..cache.breaker import STATE_VALUES
+from ..middlewares import permission_check, set_log_body, verify_metrics_access, verify_token
 from ..permission import Permission
 from ..response import success
 from ..schemas import (
     MenuParams,
     PaginationParams,
+    RefreshToken,
     ResetPassword,
     ResponseSchema,
     RoleParams,
     UserLogin,
 )
 from ..services import AuthService, LogsService, MenuService, RoleService
+from ..token import admin_bunny_token
 from ..utils import get_real_ip
 
 adminRouter = APIRouter(prefix='/admin', dependencies=[Depends(set_log_body)])
@@ -21,6 +27,8 @@ adminRouterWithAuth = APIRouter(
     prefix='/admin',
     dependencies=[Depends(verify_token), Depends(permission_check), Depends(set_log_body)],
 )
+# 指标采集器通过 IP 白名单或静态 token 访问，不需要管理员账号
+metricsRouter = APIRouter(prefix='/admin', dependencies=[Depends(verify_metrics_access)])
 
 
 @adminRouter.post('/login', name='login')
@@ -29,6 +37,20 @@ async def login(request: Request, user_login: UserLogin) -> ResponseSchema:
     return success(token)
 
 
+@adminRouter.post('/token/refresh', name='token.refresh')
+async def refresh_token(refresh_token: RefreshToken) -> ResponseSchema:
+    token = await AuthService.refresh(refresh_token)
+    return success(token)
+
+
+@adminRouter.get('/token/jwks', name='token.jwks')
+async def token_jwks() -> JSONResponse:
+    # 其他服务按 kid 缓存公钥，在本地验证 token，遇到未知 kid 时再重新获取
+    return JSONResponse(
+        admin_bunny_token.keys.jwks, headers={'Cache-Control': 'public, max-age=300'}
+    )
+
+
 @adminRouterWithAuth.post('/logout', name='logout')
 async def logout(request: Request) -> ResponseSchema:
     token = request.headers.get('Authorization')
@@ -51,10 +73,8 @@ async def user_info(request: Request) -> ResponseSchema:
 
 @adminRouterWithAuth.get('/permissions')
 async def get_permissions(request: Request) -> ResponseSchema:
-    permissions = await Permission.get_user_permissions(
-        request.state.user_id, Permission.get_flag()
-    )
-    return success(permissions)
+    permissions = await Permission.get_user_permissions(request.state.user_id)
+    return success(list(permissions))
 
 
 @adminRouterWithAuth.get('/menus')
@@ -121,3 +141,31 @@ async def role_delete(request: Request, id: int) -> ResponseSchema:
 async def logs_list(params: Annotated[PaginationParams, Query()]) -> ResponseSchema:
     logs = await LogsService.list(params)
     return success(logs)
+
+
+@adminRouterWithAuth.get('/cache/stats', name='cache.stats')
+async def cache_stats() -> ResponseSchema:
+    return success(
+        {
+            'metrics': cache_metrics.snapshot(),
+            'memory': async_bunny_cache.memory_stats(),
+            'breaker': async_bunny_cache.redis_cache.breaker.state,
+        }
+    )
+
+
+@metricsRouter.get('/cache/metrics', name='cache.metrics', response_class=PlainTextResponse)
+async def cache_metrics_export() -> PlainTextResponse:
+    memory = async_bunny_cache.memory_stats()
+    gauges = {
+        'bunny_cache_memory_entries': memory['entries'],
+        'bunny_cache_memory_bytes': memory['bytes'],
+        'bunny_cache_redis_breaker_state': STATE_VALUES[
+            async_bunny_cache.redis_cache.breaker.state
+        ],
+    }
+
+    return PlainTextResponse(
+        cache_metrics.render_prometheus(gauges, worker=str(os.getpid())),
+        media_type='text/plain; version=0.0.4',
+    )
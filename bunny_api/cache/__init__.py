@@ -0,0 +1,104 @@
+from redis import Redis
+from redis.asyncio import BlockingConnectionPool
+from redis.asyncio import Redis as AsyncRedis
+from redis.asyncio.retry import Retry as AsyncRetry
+from redis.backoff import NoBackoff
+from redis.retry import Retry
+
+from ..config import BUNNY_CONFIG
+from .base import MISSING, AsyncCache, Cache
+from .breaker import CircuitBreaker
+from .bunny import AsyncBunnyCache, AsyncBunnyPipeline, BunnyCache
+from .bus import InvalidationBus, LocalInvalidationBus, RedisInvalidationBus
+from .memory import MemoryCache
+from .metrics import CacheMetrics, cache_metrics
+from .redis_cache import AsyncRedisCache, RedisCache
+from .serializer import (
+    Codec,
+    JsonSerializer,
+    MsgpackSerializer,
+    PickleSerializer,
+    Serializer,
+    create_codec,
+)
+
+_codec = create_codec(
+    serializer=BUNNY_CONFIG.redis_serializer,
+    compression=BUNNY_CONFIG.redis_compression,
+    compress_threshold=BUNNY_CONFIG.redis_compress_threshold,
+    allow_pickle=BUNNY_CONFIG.redis_allow_pickle,
+)
+
+bunny_cache = BunnyCache(
+    Redis(
+        host=BUNNY_CONFIG.redis_host,
+        port=BUNNY_CONFIG.redis_port,
+        db=BUNNY_CONFIG.redis_db,
+        password=BUNNY_CONFIG.redis_password,
+        socket_connect_timeout=BUNNY_CONFIG.redis_socket_connect_timeout,
+        socket_timeout=BUNNY_CONFIG.redis_socket_timeout,
+        # redis-py 默认带退避重试，一次失败会花费数倍的超时时间，失败交给熔断器处理
+        retry=Retry(NoBackoff(), BUNNY_CONFIG.redis_retries),
+    ),
+    maxsize=BUNNY_CONFIG.cache_memory_maxsize,
+    max_bytes=BUNNY_CONFIG.cache_memory_max_bytes,
+    codec=_codec,
+    negative_ttl=BUNNY_CONFIG.cache_negative_ttl,
+    breaker=CircuitBreaker(
+        failure_threshold=BUNNY_CONFIG.redis_breaker_failure_threshold,
+        recovery_timeout=BUNNY_CONFIG.redis_breaker_recovery_timeout,
+    ),
+)
+
+_async_redis_client = AsyncRedis.from_pool(
+    BlockingConnectionPool(
+        host=BUNNY_CONFIG.redis_host,
+        port=BUNNY_CONFIG.redis_port,
+        db=BUNNY_CONFIG.redis_db,
+        password=BUNNY_CONFIG.redis_password,
+        max_connections=BUNNY_CONFIG.redis_max_connections,
+        timeout=BUNNY_CONFIG.redis_pool_timeout,
+        socket_connect_timeout=BUNNY_CONFIG.redis_socket_connect_timeout,
+        socket_timeout=BUNNY_CONFIG.redis_socket_timeout,
+        retry=AsyncRetry(NoBackoff(), BUNNY_CONFIG.redis_retries),
+    )
+)
+
+async_bunny_cache = AsyncBunnyCache(
+    _async_redis_client,
+    maxsize=BUNNY_CONFIG.cache_memory_maxsize,
+    max_bytes=BUNNY_CONFIG.cache_memory_max_bytes,
+    bus=RedisInvalidationBus(_async_redis_client, BUNNY_CONFIG.cache_invalidation_channel),
+    codec=_codec,
+    negative_ttl=BUNNY_CONFIG.cache_negative_ttl,
+    breaker=CircuitBreaker(
+        failure_threshold=BUNNY_CONFIG.redis_breaker_failure_threshold,
+        recovery_timeout=BUNNY_CONFIG.redis_breaker_recovery_timeout,
+    ),
+)
+
+__all__ = [
+    'MISSING',
+    'Cache',
+    'AsyncCache',
+    'MemoryCache',
+    'RedisCache',
+    'AsyncRedisCache',
+    'BunnyCache',
+    'AsyncBunnyCache',
+    'AsyncBunnyPipeline',
+    'InvalidationBus',
+    'LocalInvalidationBus',
+    'RedisInvalidationBus',
+    'Serializer',
+    'JsonSerializer',
+    'MsgpackSerializer',
+    'PickleSerializer',
+    'Codec',
+    'create_codec',
+    'CacheMetrics',
+    'CircuitBreaker',
+    'cache_metrics',
+    'bunny_cache',
+    'async_bunny_cache',
+]
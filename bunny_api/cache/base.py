@@ -0,0 +1,53 @@
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+
+class _Missing:
+    """缓存不存在的标记，用于区分不存在的 key 和值为 None 的缓存"""
+
+    def __repr__(self) -> str:
+        return 'MISSING'
+
+    def __bool__(self) -> bool:
+        return False
+
+
+MISSING: Any = _Missing()
+
+
+class Cache(ABC):
+    """缓存基类"""
+
+    @abstractmethod
+    def get(self, key: str) -> Any:
+        """获取缓存"""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """设置缓存"""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """删除缓存"""
+        pass
+
+
+class AsyncCache(ABC):
+    """异步缓存基类"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Any:
+        """获取缓存"""
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """设置缓存"""
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """删除缓存"""
+        pass
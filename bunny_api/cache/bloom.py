@@ -0,0 +1,85 @@
+import math
+import time
+from hashlib import blake2b
+from typing import Iterable, Optional
+
+
+class BloomFilter:
+    """布隆过滤器，判断不存在时一定不存在，判断存在时有一定误判率"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        初始化布隆过滤器
+
+        Args:
+            capacity: 预期元素数量，超过后误判率会上升
+            error_rate: 达到预期元素数量时的误判率
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[i >> 3] & (1 << (i & 7)) for i in self._indexes(item))
+
+    def add(self, item: str) -> None:
+        for i in self._indexes(item):
+            self.bits[i >> 3] |= 1 << (i & 7)
+        self.count += 1
+
+    def _indexes(self, item: str) -> Iterable[int]:
+        # 双重哈希：由一次 128 位哈希派生出 k 个位置
+        value = int.from_bytes(blake2b(item.encode(), digest_size=16).digest(), 'little')
+        h1 = value & 0xFFFFFFFFFFFFFFFF
+        h2 = (value >> 64) | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+
+class RotatingBloomFilter:
+    """
+    按时间轮换的布隆过滤器，用于元素会过期的集合
+
+    同时保留当前和上一代两个过滤器，元素写入当前代，查询时检查两代；
+    每经过一个周期轮换一次，丢弃上一代，元素至少保留一个周期后才会被移除
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001, period: float = 86400):
+        """
+        初始化轮换布隆过滤器
+
+        Args:
+            capacity: 每一代的预期元素数量
+            error_rate: 每一代达到预期元素数量时的误判率
+            period: 轮换周期（秒），应不小于元素的最长存活时间
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.period = period
+        self.current = BloomFilter(capacity, error_rate)
+        self.previous: Optional[BloomFilter] = None
+        self.rotate_at = time.monotonic() + period
+
+    def __contains__(self, item: str) -> bool:
+        self._maybe_rotate()
+        return item in self.current or (self.previous is not None and item in self.previous)
+
+    def add(self, item: str) -> None:
+        self._maybe_rotate()
+        self.current.add(item)
+
+    @property
+    def saturated(self) -> bool:
+        """当前代的元素数量是否超过预期，超过后应重建"""
+        return self.current.count > self.capacity
+
+    def rotate(self) -> None:
+        self.previous = self.current
+        self.current = BloomFilter(self.capacity, self.error_rate)
+        self.rotate_at = time.monotonic() + self.period
+
+    def _maybe_rotate(self) -> None:
+        if time.monotonic() >= self.rotate_at:
+            self.rotate()
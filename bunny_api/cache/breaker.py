@@ -0,0 +1,87 @@
+import time
+from typing import Optional
+
+from fastapi.logger import logger
+
+from .metrics import CacheMetrics, cache_metrics
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+# 导出为 Prometheus 指标时使用的数值
+STATE_VALUES = {STATE_CLOSED: 0, STATE_OPEN: 1, STATE_HALF_OPEN: 2}
+
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    连续失败达到阈值后打开，打开期间的调用直接失败；
+    经过恢复时间后进入半开状态，放行一次试探调用，成功则关闭，失败则重新打开
+    """
+
+    def __init__(
+        self,
+        name: str = 'redis',
+        failure_threshold: int = 5,
+        recovery_timeout: float = 10,
+        metrics: Optional[CacheMetrics] = None,
+    ):
+        """
+        初始化熔断器
+
+        Args:
+            name: 名称，用作指标标签
+            failure_threshold: 连续失败多少次后打开
+            recovery_timeout: 打开后多少秒进入半开状态
+            metrics: 指标收集器，默认为全局的 cache_metrics
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.metrics = metrics or cache_metrics
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return self.state != STATE_CLOSED
+
+    def allow(self) -> bool:
+        """是否允许本次调用"""
+        if self.state == STATE_CLOSED:
+            return True
+
+        now = time.monotonic()
+        if now - self.opened_at >= self.recovery_timeout:
+            # 每个恢复周期只放行一次试探调用，试探被取消没有结果时下个周期再试
+            self.opened_at = now
+            if self.state == STATE_OPEN:
+                self._transition(STATE_HALF_OPEN)
+            return True
+
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        if self.state != STATE_CLOSED:
+            self._transition(STATE_CLOSED)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == STATE_HALF_OPEN or (
+            self.state == STATE_CLOSED and self.failures >= self.failure_threshold
+        ):
+            self.opened_at = time.monotonic()
+            self._transition(STATE_OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state == STATE_OPEN:
+            logger.warning(f'{self.name} 熔断器打开，连续失败 {self.failures} 次')
+        elif state == STATE_CLOSED:
+            logger.warning(f'{self.name} 熔断器关闭，服务已恢复')
+
+        self.state = state
+        self.metrics.incr('breaker', state, self.name)
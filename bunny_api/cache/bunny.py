@@ -0,0 +1,708 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from fastapi.logger import logger
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+
+from ..exceptions import CacheUnavailableError
+from .base import MISSING
+from .breaker import CircuitBreaker
+from .bus import InvalidationBus
+from .memory import MemoryCache
+from .metrics import CacheMetrics, cache_metrics
+from .redis_cache import AsyncRedisCache, RedisCache, WriteOperation
+from .serializer import Codec
+
+_UNCACHED = object()
+
+
+class BunnyCache:
+    def __init__(
+        self,
+        redis_client: Redis,
+        maxsize: int = 1024,
+        max_bytes: Optional[int] = None,
+        codec: Optional[Codec] = None,
+        metrics: Optional[CacheMetrics] = None,
+        negative_ttl: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        """
+        使用内存和 Redis 实现多级缓存
+
+        Redis 不可用时 get 和 get_many 仅返回内存中的缓存，熔断器打开期间不再等待 Redis 超时
+
+        Args:
+            redis_client: Redis 客户端实例
+            maxsize: 最大内存缓存条目数，默认为 1024
+            max_bytes: 内存缓存的最大字节数（近似值），为空时不限制
+            codec: Redis 值的编解码器，默认使用 JSON 并回退到 pickle
+            metrics: 指标收集器，默认为全局的 cache_metrics
+            negative_ttl: Redis 中不存在的 key 在内存中记为不存在的时间（秒），为空时不缓存
+            breaker: Redis 熔断器，为空时使用默认配置
+        """
+        self.metrics = metrics or cache_metrics
+        self.memory_cache = MemoryCache(maxsize=maxsize, max_bytes=max_bytes, metrics=self.metrics)
+        self.redis_cache = RedisCache(redis_client, codec, self.metrics, breaker)
+        self.negative_ttl = negative_ttl
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """获取缓存,优先从内存获取,不存在则从 Redis 获取"""
+        try:
+            found, value = self.get_with_status(key)
+        except CacheUnavailableError:
+            return default
+
+        return value if found else default
+
+    def get_with_status(self, key: str) -> Tuple[bool, Any]:
+        """
+        获取缓存及其是否存在，可以区分不存在的 key 和值为 None 的缓存
+
+        Returns:
+            (是否存在, 缓存值)，不存在时缓存值为 MISSING
+
+        Raises:
+            CacheUnavailableError: 内存未命中且 Redis 不可用
+        """
+        # 优先从内存缓存中获取，负缓存条目直接视为不存在
+        value = self.memory_cache.get(key, _UNCACHED)
+        if value is not _UNCACHED:
+            return value is not MISSING, value
+
+        # 从 Redis 中获取，写入内存时沿用 Redis 的剩余过期时间
+        value, ttl = self.redis_cache.get_with_ttl(key)
+        if value is MISSING:
+            self._set_negative(key)
+            return False, MISSING
+
+        self._promote(key, value, ttl)
+        return True, value
+
+    def contains(self, key: str) -> bool:
+        """判断缓存是否存在"""
+        return self.get_with_status(key)[0]
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """同时设置内存和 Redis 缓存，先写 Redis，失败时淘汰内存中的旧值"""
+        try:
+            self.redis_cache.set(key, value, ttl)
+        except CacheUnavailableError:
+            self.memory_cache.delete(key)
+            raise
+
+        self.memory_cache.set(key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        """同时删除内存和 Redis 缓存"""
+        self.memory_cache.delete(key)
+        self.redis_cache.delete(key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """批量获取缓存，内存未命中的 key 通过一次 Redis 往返获取"""
+        values, misses = self._get_many_memory(keys)
+
+        try:
+            found = self.redis_cache.get_many_with_ttl(misses)
+        except CacheUnavailableError:
+            return values
+
+        for key in misses:
+            if key not in found:
+                self._set_negative(key)
+                continue
+
+            value, ttl = found[key]
+            self._promote(key, value, ttl)
+            values[key] = value
+
+        return values
+
+    def set_many(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        """批量设置内存和 Redis 缓存，先写 Redis，失败时淘汰内存中的旧值"""
+        try:
+            self.redis_cache.set_many(mapping, ttl)
+        except CacheUnavailableError:
+            for key in mapping:
+                self.memory_cache.delete(key)
+            raise
+
+        for key, value in mapping.items():
+            self.memory_cache.set(key, value, ttl)
+
+    def delete_many(self, keys: List[str]) -> None:
+        """批量删除内存和 Redis 缓存"""
+        for key in keys:
+            self.memory_cache.delete(key)
+        self.redis_cache.delete_many(keys)
+
+    def get_memory(self, key: str) -> Any:
+        """仅从内存获取缓存"""
+        value = self.memory_cache.get(key)
+        return None if value is MISSING else value
+
+    def set_memory(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """仅设置内存缓存"""
+        self.memory_cache.set(key, value, ttl)
+
+    def delete_memory(self, key: str) -> None:
+        """仅删除内存缓存"""
+        self.memory_cache.delete(key)
+
+    def memory_stats(self) -> dict:
+        """获取内存缓存的容量统计"""
+        return self.memory_cache.stats()
+
+    def get_redis(self, key: str) -> Any:
+        """仅从 Redis 获取缓存"""
+        return self.redis_cache.get(key)
+
+    def get_many_redis(self, keys: List[str]) -> Dict[str, Any]:
+        """仅从 Redis 批量获取缓存"""
+        return self.redis_cache.get_many(keys)
+
+    def set_redis(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """仅设置 Redis 缓存，同时淘汰内存中的旧值和负缓存"""
+        self.memory_cache.delete(key)
+        self.redis_cache.set(key, value, ttl)
+
+    def delete_redis(self, key: str) -> None:
+        """仅删除 Redis 缓存"""
+        self.memory_cache.delete(key)
+        self.redis_cache.delete(key)
+
+    def _get_many_memory(self, keys: List[str]) -> Tuple[Dict[str, Any], List[str]]:
+        """从内存批量获取缓存，返回命中的值和未命中的 key"""
+        values = {}
+        misses = []
+
+        for key in keys:
+            value = self.memory_cache.get(key, _UNCACHED)
+            if value is _UNCACHED:
+                misses.append(key)
+            elif value is not MISSING:
+                values[key] = value
+
+        return values, misses
+
+    def _promote(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        """将 Redis 中读到的值写入内存缓存"""
+        self.memory_cache.set(key, value, ttl)
+        self.metrics.incr('memory', 'promotion', key)
+
+    def _set_negative(self, key: str) -> None:
+        """在内存中记录 key 不存在，过期前不再访问 Redis"""
+        if self.negative_ttl:
+            self.memory_cache.set(key, MISSING, self.negative_ttl)
+
+
+class AsyncBunnyCache:
+    def __init__(
+        self,
+        redis_client: AsyncRedis,
+        maxsize: int = 1024,
+        max_bytes: Optional[int] = None,
+        bus: Optional[InvalidationBus] = None,
+        codec: Optional[Codec] = None,
+        metrics: Optional[CacheMetrics] = None,
+        negative_ttl: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        """
+        使用内存和 redis.asyncio 实现的异步多级缓存，Redis 读写不会阻塞事件循环
+
+        Redis 中的值被修改或删除时，通过消息总线通知其他 worker 淘汰对应的内存缓存
+
+        Args:
+            redis_client: redis.asyncio 客户端实例
+            maxsize: 最大内存缓存条目数，默认为 1024
+            max_bytes: 内存缓存的最大字节数（近似值），为空时不限制
+            bus: 缓存失效消息总线，为空时仅在当前进程内生效
+            codec: Redis 值的编解码器，默认使用 JSON 并回退到 pickle
+            metrics: 指标收集器，默认为全局的 cache_metrics
+            negative_ttl: Redis 中不存在的 key 在内存中记为不存在的时间（秒），为空时不缓存，
+                其他 worker 写入该 key 时会通过消息总线淘汰负缓存
+            breaker: Redis 熔断器，为空时使用默认配置
+        """
+        self.metrics = metrics or cache_metrics
+        self.memory_cache = MemoryCache(maxsize=maxsize, max_bytes=max_bytes, metrics=self.metrics)
+        self.redis_cache = AsyncRedisCache(redis_client, codec, self.metrics, breaker)
+        self.negative_ttl = negative_ttl
+        self.bus = bus
+        self.node_id = uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._handlers: Dict[str, List[Callable[[dict], None]]] = {}
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        """获取缓存,优先从内存获取,不存在则从 Redis 获取,Redis 不可用时返回 default"""
+        try:
+            found, value = await self.get_with_status(key)
+        except CacheUnavailableError:
+            return default
+
+        return value if found else default
+
+    async def get_with_status(self, key: str) -> Tuple[bool, Any]:
+        """
+        获取缓存及其是否存在，可以区分不存在的 key 和值为 None 的缓存
+
+        Returns:
+            (是否存在, 缓存值)，不存在时缓存值为 MISSING
+
+        Raises:
+            CacheUnavailableError: 内存未命中且 Redis 不可用
+        """
+        value = self.memory_cache.get(key, _UNCACHED)
+        if value is not _UNCACHED:
+            return value is not MISSING, value
+
+        # 写入内存时沿用 Redis 的剩余过期时间
+        value, ttl = await self.redis_cache.get_with_ttl(key)
+        if value is MISSING:
+            self._set_negative(key)
+            return False, MISSING
+
+        self._promote(key, value, ttl)
+        return True, value
+
+    async def contains(self, key: str) -> bool:
+        """判断缓存是否存在"""
+        return (await self.get_with_status(key))[0]
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """
+        同时设置内存和 Redis 缓存
+
+        先写 Redis，成功后再写内存，避免 Redis 写入失败时只有当前 worker 读到新值；
+        写入失败时 Redis 中的结果不确定，同时淘汰内存中的旧值
+        """
+        try:
+            await self.redis_cache.set(key, value, ttl)
+        except CacheUnavailableError:
+            self.memory_cache.delete(key)
+            raise
+
+        self.memory_cache.set(key, value, ttl)
+        await self._publish(keys=[key])
+
+    async def delete(self, key: str) -> None:
+        """同时删除内存和 Redis 缓存"""
+        self.memory_cache.delete(key)
+        await self.redis_cache.delete(key)
+        await self._publish(keys=[key])
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """批量获取缓存，内存未命中的 key 通过一次 Redis 往返获取"""
+        values, misses = self._get_many_memory(keys)
+
+        try:
+            found = await self.redis_cache.get_many_with_ttl(misses)
+        except CacheUnavailableError:
+            return values
+
+        for key in misses:
+            if key not in found:
+                self._set_negative(key)
+                continue
+
+            value, ttl = found[key]
+            self._promote(key, value, ttl)
+            values[key] = value
+
+        return values
+
+    async def set_many(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        """批量设置内存和 Redis 缓存"""
+        async with self.pipeline() as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, value, ttl)
+
+    async def delete_many(self, keys: List[str]) -> None:
+        """批量删除内存和 Redis 缓存"""
+        async with self.pipeline() as pipe:
+            for key in keys:
+                pipe.delete(key)
+
+    def pipeline(self) -> 'AsyncBunnyPipeline':
+        """
+        批量写入，退出上下文时通过一次 Redis pipeline 提交并合并广播失效消息
+
+        Example:
+            async with async_bunny_cache.pipeline() as pipe:
+                pipe.set('a', 1, 60)
+                pipe.delete('b')
+        """
+        return AsyncBunnyPipeline(self)
+
+    @asynccontextmanager
+    async def lock(self, key: str, timeout: float) -> AsyncIterator[bool]:
+        """
+        跨进程互斥锁，用于保护读取-修改-写入
+
+        等待超过 timeout 仍未获取到锁时不再等待，直接执行，锁本身也会在 timeout 后过期
+
+        Example:
+            async with async_bunny_cache.lock('a', 3):
+                value = await async_bunny_cache.get_redis('a')
+                await async_bunny_cache.set('a', value + 1)
+
+        Yields:
+            是否获取到锁
+        """
+        lock_key = f'bunny:lock:{key}'
+        token = uuid4().hex
+        deadline = time.monotonic() + timeout
+
+        locked = await self.redis_cache.acquire_lock(lock_key, token, timeout)
+        while not locked and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            locked = await self.redis_cache.acquire_lock(lock_key, token, timeout)
+
+        try:
+            yield locked
+        finally:
+            if locked:
+                await self.redis_cache.release_lock(lock_key, token)
+
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        lock_timeout: Optional[float] = None,
+        none_ttl: Optional[int] = None,
+    ) -> Any:
+        """
+        获取缓存，不存在时调用 loader 加载并写入缓存
+
+        同一进程内对同一个 key 的并发未命中只会调用一次 loader，
+        指定 lock_timeout 时还会通过 Redis 锁在多个进程之间合并加载，
+        Redis 不可用时直接调用 loader，结果只在内存中保留一个熔断恢复周期
+
+        Args:
+            key: 缓存 key
+            loader: 加载数据的异步函数
+            ttl: 过期时间（秒），为空时永不过期
+            lock_timeout: 跨进程锁的过期时间（秒），为空时不加锁
+            none_ttl: loader 返回 None 时缓存 None 的时间（秒），为空时不缓存，
+                用于避免不存在的数据每次都访问数据库
+
+        Returns:
+            缓存值
+        """
+        try:
+            found, value = await self.get_with_status(key)
+            if found:
+                return value
+        except CacheUnavailableError:
+            pass
+
+        task = self._inflight.get(key)
+        if task is None:
+            # 加载任务独立于调用方，某个请求被取消不会影响其他等待者
+            task = asyncio.create_task(self._load(key, loader, ttl, lock_timeout, none_ttl))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        return await asyncio.shield(task)
+
+    async def invalidate(
+        self, keys: Optional[List[str]] = None, prefixes: Optional[List[str]] = None
+    ) -> None:
+        """
+        淘汰所有 worker 中的内存缓存，不影响 Redis
+
+        Args:
+            keys: 需要淘汰的 key 列表
+            prefixes: 需要淘汰的 key 前缀列表，用于命名空间整体失效
+        """
+        self._evict(keys, prefixes)
+        await self._publish(keys=keys, prefixes=prefixes)
+
+    def on_message(self, type: str, handler: Callable[[dict], None]) -> None:
+        """
+        注册消息处理函数，用于同步缓存之外的进程内状态
+
+        订阅中断重连后会以 {'type': 'reset'} 调用 reset 类型的处理函数，
+        此时可能丢失了部分消息，处理函数应清空对应的状态
+
+        Args:
+            type: 消息类型
+            handler: 处理函数，参数为消息内容，只处理其他 worker 发布的消息
+        """
+        self._handlers.setdefault(type, []).append(handler)
+
+    async def broadcast(self, type: str, **data: Any) -> None:
+        """
+        向其他 worker 广播消息，发布失败只记录日志
+
+        总线使用 Redis 时发布受熔断器保护，熔断期间跳过发布并计入 bus skip 指标
+
+        Args:
+            type: 消息类型，由 on_message 注册的处理函数处理
+            data: 消息内容，需要可以被 JSON 序列化
+        """
+        if self.bus is None:
+            return
+
+        message = {'origin': self.node_id, 'type': type, **data}
+        if not self.bus.uses_redis:
+            try:
+                await self.bus.publish(message)
+            except Exception as e:
+                logger.error(f'缓存消息发布失败: {e}')
+            return
+
+        if not self.redis_cache.available:
+            self.metrics.incr('bus', 'skip', type)
+            return
+
+        try:
+            await self.redis_cache.call('publish', type, self.bus.publish, message)
+        except Exception as e:
+            self.metrics.incr('bus', 'error', type)
+            logger.error(f'缓存消息发布失败: {e}')
+
+    # 内存缓存不涉及 IO，保持同步调用
+
+    def get_memory(self, key: str) -> Any:
+        """仅从内存获取缓存"""
+        value = self.memory_cache.get(key)
+        return None if value is MISSING else value
+
+    def set_memory(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """仅设置内存缓存"""
+        self.memory_cache.set(key, value, ttl)
+
+    def delete_memory(self, key: str) -> None:
+        """仅删除内存缓存"""
+        self.memory_cache.delete(key)
+
+    def memory_stats(self) -> dict:
+        """获取内存缓存的容量统计"""
+        return self.memory_cache.stats()
+
+    async def get_redis(self, key: str) -> Any:
+        """仅从 Redis 获取缓存"""
+        return await self.redis_cache.get(key)
+
+    async def get_many_redis(self, keys: List[str]) -> Dict[str, Any]:
+        """仅从 Redis 批量获取缓存"""
+        return await self.redis_cache.get_many(keys)
+
+    async def scan_redis(self, match: str) -> List[str]:
+        """获取 Redis 中匹配的 key"""
+        return await self.redis_cache.scan(match)
+
+    async def set_redis(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """仅设置 Redis 缓存，同时淘汰所有 worker 内存中的旧值和负缓存"""
+        self.memory_cache.delete(key)
+        await self.redis_cache.set(key, value, ttl)
+        await self._publish(keys=[key])
+
+    async def delete_redis(self, key: str) -> None:
+        """仅删除 Redis 缓存"""
+        self.memory_cache.delete(key)
+        await self.redis_cache.delete(key)
+        await self._publish(keys=[key])
+
+    async def start(self) -> None:
+        """启动后台任务订阅缓存失效消息"""
+        if self.bus is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        """停止订阅并关闭 Redis 连接池"""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+        if self.bus is not None:
+            await self.bus.close()
+
+        await self.redis_cache.close()
+
+    _get_many_memory = BunnyCache._get_many_memory
+    _promote = BunnyCache._promote
+    _set_negative = BunnyCache._set_negative
+
+    async def _load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[int],
+        lock_timeout: Optional[float],
+        none_ttl: Optional[int] = None,
+    ) -> Any:
+        """加载数据并写入缓存"""
+        lock_key = f'bunny:lock:{key}'
+        locked = False
+
+        try:
+            try:
+                if lock_timeout is not None:
+                    deadline = time.monotonic() + lock_timeout
+                    locked = await self.redis_cache.acquire_lock(
+                        lock_key, self.node_id, lock_timeout
+                    )
+
+                    # 其他进程正在加载，等待其写入 Redis，超时后自行加载
+                    while not locked and time.monotonic() < deadline:
+                        await asyncio.sleep(0.05)
+                        value = await self._get_from_redis(key)
+                        if value is not None:
+                            return value
+
+                if locked:
+                    # 获取锁之前其他进程可能刚好完成了加载
+                    value = await self._get_from_redis(key)
+                    if value is not None:
+                        return value
+            except CacheUnavailableError:
+                # Redis 不可用时不再等待其他进程，直接加载
+                pass
+
+            value = await loader()
+
+            if value is None:
+                if not none_ttl:
+                    return None
+                ttl = none_ttl
+
+            # 新加载的值在其他 worker 中不存在旧副本，无需广播失效消息
+            try:
+                await self.redis_cache.set(key, value, ttl)
+                self.memory_cache.set(key, value, ttl)
+            except CacheUnavailableError:
+                # 只在内存中短暂保留，避免 Redis 恢复后长期与其不一致
+                recovery_timeout = self.redis_cache.breaker.recovery_timeout
+                self.memory_cache.set(key, value, min(ttl or recovery_timeout, recovery_timeout))
+
+            return value
+        finally:
+            if locked:
+                try:
+                    await self.redis_cache.release_lock(lock_key, self.node_id)
+                except CacheUnavailableError:
+                    # 锁会在超时后自动释放
+                    pass
+
+    async def _get_from_redis(self, key: str) -> Any:
+        """跳过内存中的负缓存直接读取 Redis，命中时写入内存"""
+        value, ttl = await self.redis_cache.get_with_ttl(key)
+        if value is MISSING:
+            return None
+
+        self._promote(key, value, ttl)
+        return value
+
+    def _evict(
+        self, keys: Optional[List[str]] = None, prefixes: Optional[List[str]] = None
+    ) -> None:
+        """淘汰当前进程的内存缓存"""
+        for key in keys or []:
+            self.memory_cache.delete(key)
+
+        for prefix in prefixes or []:
+            self.memory_cache.delete_prefix(prefix)
+
+    async def _publish(
+        self, keys: Optional[List[str]] = None, prefixes: Optional[List[str]] = None
+    ) -> None:
+        """广播缓存失效消息，发布失败不影响写入"""
+        await self.broadcast('evict', keys=keys or [], prefixes=prefixes or [])
+
+    def _handle_message(self, message: dict) -> None:
+        """处理其他 worker 发布的消息"""
+        if message.get('origin') == self.node_id:
+            return
+
+        if message.get('type') == 'evict':
+            self._evict(message.get('keys'), message.get('prefixes'))
+
+        self._dispatch(message)
+
+    def _dispatch(self, message: dict) -> None:
+        """调用注册的消息处理函数，单个处理函数出错不影响其他处理函数"""
+        for handler in self._handlers.get(message.get('type'), []):
+            try:
+                handler(message)
+            except Exception as e:
+                logger.error(f'缓存消息处理失败: {e}')
+
+    async def _listen(self) -> None:
+        """订阅失效消息，连接中断后自动重连"""
+        while True:
+            try:
+                async for message in self.bus.listen():
+                    self._handle_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f'缓存失效消息订阅中断: {e}')
+
+            # 中断期间可能丢失消息，清空内存缓存避免读到过期数据
+            self.memory_cache.clear()
+            self._dispatch({'type': 'reset'})
+            await asyncio.sleep(1)
+
+
+class AsyncBunnyPipeline:
+    """AsyncBunnyCache 的批量写入上下文"""
+
+    def __init__(self, cache: AsyncBunnyCache):
+        self.cache = cache
+        self.operations: List[Tuple[WriteOperation, bool]] = []  # (写入操作, 是否同时写内存)
+
+    async def __aenter__(self) -> 'AsyncBunnyPipeline':
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            await self.execute()
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """同时设置内存和 Redis 缓存"""
+        self.operations.append((('set', key, value, ttl), True))
+
+    def delete(self, key: str) -> None:
+        """同时删除内存和 Redis 缓存"""
+        self.operations.append((('delete', key, None, None), True))
+
+    def set_redis(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """仅设置 Redis 缓存"""
+        self.operations.append((('set', key, value, ttl), False))
+
+    def delete_redis(self, key: str) -> None:
+        """仅删除 Redis 缓存"""
+        self.operations.append((('delete', key, None, None), False))
+
+    async def execute(self) -> None:
+        """提交所有写入操作"""
+        operations, self.operations = self.operations, []
+        if not operations:
+            return
+
+        # 先淘汰内存中的旧值，Redis 写入成功后再按顺序写内存，失败时内存中不会留下 Redis 中没有的值
+        for (_, key, _, _), _ in operations:
+            self.cache.memory_cache.delete(key)
+
+        await self.cache.redis_cache.write_many([operation for operation, _ in operations])
+
+        for (command, key, value, ttl), memory in operations:
+            # 仅写 Redis 的操作也要淘汰内存中的旧值和负缓存
+            if memory and command == 'set':
+                self.cache.memory_cache.set(key, value, ttl)
+            else:
+                self.cache.memory_cache.delete(key)
+
+        await self.cache._publish(keys=list(dict.fromkeys(op[1] for op, _ in operations)))
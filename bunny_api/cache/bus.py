@@ -0,0 +1,83 @@
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, List
+
+from redis.asyncio import Redis as AsyncRedis
+
+
+class InvalidationBus(ABC):
+    """缓存失效消息总线，用于在多个 worker 之间同步内存缓存的失效"""
+
+    # 是否通过 Redis 传递消息，是则发布受 Redis 熔断器保护
+    uses_redis = False
+
+    @abstractmethod
+    async def publish(self, message: dict) -> None:
+        """发布消息"""
+        pass
+
+    @abstractmethod
+    def listen(self) -> AsyncIterator[dict]:
+        """订阅消息，返回异步迭代器"""
+        pass
+
+    async def close(self) -> None:
+        """关闭总线"""
+        pass
+
+
+class LocalInvalidationBus(InvalidationBus):
+    """
+    进程内消息总线
+
+    所有订阅者共享同一个实例即可模拟多个 worker，适用于测试和单进程部署
+    """
+
+    def __init__(self):
+        self.queues: List[asyncio.Queue] = []
+
+    async def publish(self, message: dict) -> None:
+        for queue in self.queues:
+            queue.put_nowait(message)
+
+    async def listen(self) -> AsyncIterator[dict]:
+        queue = asyncio.Queue()
+        self.queues.append(queue)
+
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.queues.remove(queue)
+
+
+class RedisInvalidationBus(InvalidationBus):
+    """基于 Redis Pub/Sub 的消息总线"""
+
+    uses_redis = True
+
+    def __init__(self, redis_client: AsyncRedis, channel: str = 'bunny:cache:invalidate'):
+        """
+        初始化 Redis 消息总线
+
+        Args:
+            redis_client: redis.asyncio 客户端实例
+            channel: 频道名称
+        """
+        self.redis_client = redis_client
+        self.channel = channel
+
+    async def publish(self, message: dict) -> None:
+        await self.redis_client.publish(self.channel, json.dumps(message))
+
+    async def listen(self) -> AsyncIterator[dict]:
+        pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self.channel)
+
+        try:
+            async for message in pubsub.listen():
+                if message['type'] == 'message':
+                    yield json.loads(message['data'])
+        finally:
+            await pubsub.aclose()
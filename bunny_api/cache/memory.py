@@ -0,0 +1,230 @@
+import heapq
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, Tuple
+
+from .base import MISSING, Cache
+from .metrics import CacheMetrics, cache_metrics
+
+_ABSENT = object()
+
+
+def sizeof(value: Any, depth: int = 3) -> int:
+    """
+    估算对象占用的字节数，会递归计算常见容器中的元素
+
+    Args:
+        value: 对象
+        depth: 最大递归深度
+    """
+    size = sys.getsizeof(value)
+
+    if depth <= 0:
+        return size
+
+    if isinstance(value, dict):
+        size += sum(sizeof(k, depth - 1) + sizeof(v, depth - 1) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(sizeof(item, depth - 1) for item in value)
+
+    return size
+
+
+class LRUStore:
+    """
+    按条目数和近似字节数限制容量的 LRU 存储，支持按条目设置过期时间
+
+    读取时惰性判断过期，写入时借助最小堆周期性清理已过期的条目
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        max_bytes: Optional[int] = None,
+        listener: Optional[Callable[[str, str], None]] = None,
+    ):
+        """
+        初始化 LRU 存储
+
+        Args:
+            maxsize: 最大条目数
+            max_bytes: 最大字节数，为空时不限制
+            listener: 条目被淘汰或过期时的回调，参数为 (事件, key)，事件为 eviction / expiration
+        """
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.listener = listener
+        self.data: OrderedDict[str, Tuple[Any, int, Optional[float]]] = OrderedDict()
+        self.expires: List[Tuple[float, str]] = []  # (过期时间, key) 最小堆
+        self.bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, MISSING) is not MISSING
+
+    def get(self, key: str, default: Any = None) -> Any:
+        item = self.data.get(key)
+        if item is None:
+            return default
+
+        if item[2] is not None and item[2] <= time.monotonic():
+            self.pop(key)
+            self._expired(key)
+            return default
+
+        self.data.move_to_end(key)
+        return item[0]
+
+    def ttl(self, key: str) -> Optional[float]:
+        """获取剩余过期时间（秒），永不过期或不存在时返回 None"""
+        item = self.data.get(key)
+        if item is None or item[2] is None:
+            return None
+
+        return max(0.0, item[2] - time.monotonic())
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.pop(key)
+        self.purge()
+
+        size = sizeof(key) + sizeof(value)
+
+        # 单个值超过容量上限时不缓存，避免清空其他条目
+        if self.max_bytes is not None and size > self.max_bytes:
+            self._evicted(key)
+            return
+
+        expires_at = None
+        if ttl is not None:
+            expires_at = time.monotonic() + ttl
+            heapq.heappush(self.expires, (expires_at, key))
+
+        self.data[key] = (value, size, expires_at)
+        self.bytes += size
+
+        while self.data and (
+            len(self.data) > self.maxsize
+            or (self.max_bytes is not None and self.bytes > self.max_bytes)
+        ):
+            evicted_key, (_, evicted_size, _) = self.data.popitem(last=False)
+            self.bytes -= evicted_size
+            self._evicted(evicted_key)
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        item = self.data.pop(key, None)
+        if item is None:
+            return default
+
+        self.bytes -= item[1]
+        return item[0]
+
+    def purge(self) -> None:
+        """清理已过期的条目"""
+        now = time.monotonic()
+
+        while self.expires and self.expires[0][0] <= now:
+            expires_at, key = heapq.heappop(self.expires)
+            item = self.data.get(key)
+
+            # 堆中可能残留已被覆盖或删除的条目，只处理过期时间一致的
+            if item is not None and item[2] == expires_at:
+                self.pop(key)
+                self._expired(key)
+
+        # 失效的堆节点过多时重建，避免堆无限增长
+        if len(self.expires) > 2 * len(self.data) + 64:
+            self.expires = [
+                (item[2], key) for key, item in self.data.items() if item[2] is not None
+            ]
+            heapq.heapify(self.expires)
+
+    def keys(self) -> List[str]:
+        return list(self.data.keys())
+
+    def clear(self) -> None:
+        self.data.clear()
+        self.expires.clear()
+        self.bytes = 0
+
+    def _evicted(self, key: str) -> None:
+        self.evictions += 1
+        if self.listener is not None:
+            self.listener('eviction', key)
+
+    def _expired(self, key: str) -> None:
+        self.expirations += 1
+        if self.listener is not None:
+            self.listener('expiration', key)
+
+
+class MemoryCache(Cache):
+    """内存缓存"""
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        max_bytes: Optional[int] = None,
+        metrics: Optional[CacheMetrics] = None,
+    ):
+        """
+        初始化内存缓存
+
+        Args:
+            maxsize: 最大缓存条目数，默认为 1024
+            max_bytes: 最大字节数（近似值），为空时不限制
+            metrics: 指标收集器，默认为全局的 cache_metrics
+        """
+        self.metrics = metrics or cache_metrics
+        self.store = LRUStore(maxsize=maxsize, max_bytes=max_bytes, listener=self._on_remove)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """获取缓存，负缓存条目返回 MISSING"""
+        value = self.store.get(key, _ABSENT)
+        if value is _ABSENT:
+            self.metrics.incr('memory', 'miss', key)
+            return default
+
+        self.metrics.incr('memory', 'negative_hit' if value is MISSING else 'hit', key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.store.set(key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        self.store.pop(key)
+
+    def ttl(self, key: str) -> Optional[float]:
+        """获取剩余过期时间（秒），永不过期或不存在时返回 None"""
+        return self.store.ttl(key)
+
+    def delete_prefix(self, prefix: str) -> None:
+        """删除指定前缀的所有缓存"""
+        for key in [key for key in self.store.keys() if key.startswith(prefix)]:
+            self.store.pop(key)
+
+    def purge(self) -> None:
+        """清理已过期的缓存"""
+        self.store.purge()
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self.store.clear()
+
+    def stats(self) -> dict:
+        """获取内存缓存的容量统计"""
+        return {
+            'entries': len(self.store),
+            'bytes': self.store.bytes,
+            'evictions': self.store.evictions,
+            'expirations': self.store.expirations,
+            'maxsize': self.store.maxsize,
+            'max_bytes': self.store.max_bytes,
+        }
+
+    def _on_remove(self, event: str, key: str) -> None:
+        self.metrics.incr('memory', event, key)
@@ -0,0 +1,170 @@
+import re
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Redis 调用耗时直方图的桶边界（秒）
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+_DIGIT = re.compile(r'\d')
+
+
+# 每次读写缓存都会计算标签，热点 key 只解析一次
+@lru_cache(maxsize=10000)
+def key_prefix(key: str, max_segments: int = 3) -> str:
+    """
+    获取 key 的前缀，用作指标标签
+
+    从左到右取以 : 分隔的片段，遇到包含数字的片段（用户 ID、token 摘要等）时停止，
+    例如 permission:user:1:1700000000 -> permission:user
+
+    Args:
+        key: 缓存 key
+        max_segments: 最多保留的片段数
+    """
+    segments = []
+
+    for segment in key.split(':', max_segments)[:max_segments]:
+        if _DIGIT.search(segment):
+            break
+        segments.append(segment)
+
+    return ':'.join(segments) or 'other'
+
+
+class Histogram:
+    """固定桶边界的直方图"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'buckets': dict(zip([*map(str, self.buckets), '+Inf'], self.counts)),
+        }
+
+
+class CacheMetrics:
+    """
+    缓存指标
+
+    - 计数器按 (层级, 事件, key 前缀) 统计，
+      事件包括 hit / miss / negative_hit / promotion / eviction / expiration / error
+    - 消息总线按 (bus, 事件, 消息类型) 统计，事件包括 skip（熔断期间跳过发布）/ error
+    - Redis 调用耗时按 (命令, key 前缀) 统计直方图
+    """
+
+    def __init__(self):
+        self.counters: Dict[Tuple[str, str, str], int] = {}
+        self.latencies: Dict[Tuple[str, str], Histogram] = {}
+
+    def incr(self, tier: str, event: str, key: str, value: int = 1) -> None:
+        """增加计数"""
+        label = (tier, event, key_prefix(key))
+        self.counters[label] = self.counters.get(label, 0) + value
+
+    def observe(self, command: str, key: str, seconds: float) -> None:
+        """记录 Redis 调用耗时"""
+        label = (command, key_prefix(key))
+        histogram = self.latencies.get(label)
+        if histogram is None:
+            histogram = self.latencies[label] = Histogram()
+        histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, command: str, key: str) -> Iterator[None]:
+        """记录 Redis 调用耗时，调用失败时计入 error"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.incr('redis', 'error', key)
+            raise
+        finally:
+            self.observe(command, key, time.perf_counter() - start)
+
+    def reset(self) -> None:
+        """清空所有指标"""
+        self.counters.clear()
+        self.latencies.clear()
+
+    def snapshot(self) -> dict:
+        """获取指标快照"""
+        counters: Dict[str, Dict[str, Dict[str, int]]] = {}
+        for (tier, event, prefix), value in sorted(self.counters.items()):
+            counters.setdefault(tier, {}).setdefault(prefix, {})[event] = value
+
+        latencies: Dict[str, Dict[str, dict]] = {}
+        for (command, prefix), histogram in sorted(self.latencies.items()):
+            latencies.setdefault(command, {})[prefix] = histogram.snapshot()
+
+        return {'counters': counters, 'redis_latency': latencies}
+
+    def render_prometheus(
+        self, gauges: Optional[Dict[str, float]] = None, worker: Optional[str] = None
+    ) -> str:
+        """
+        以 Prometheus 文本格式导出指标
+
+        Args:
+            gauges: 额外导出的瞬时值，例如内存缓存条目数
+            worker: 当前 worker 的标识，设置后所有指标带上 worker 标签，
+                每个 worker 只导出自己的计数，不同 worker 的指标不会被当作同一个序列
+        """
+        extra = {'worker': worker} if worker is not None else {}
+
+        lines: List[str] = [
+            '# HELP bunny_cache_events_total Cache events by tier, event and key prefix.',
+            '# TYPE bunny_cache_events_total counter',
+        ]
+
+        for (tier, event, prefix), value in sorted(self.counters.items()):
+            labels = _labels(tier=tier, event=event, prefix=prefix, **extra)
+            lines.append(f'bunny_cache_events_total{{{labels}}} {value}')
+
+        lines += [
+            '# HELP bunny_cache_redis_seconds Redis call latency by command and key prefix.',
+            '# TYPE bunny_cache_redis_seconds histogram',
+        ]
+
+        for (command, prefix), histogram in sorted(self.latencies.items()):
+            cumulative = 0
+            for bound, count in zip([*map(str, histogram.buckets), '+Inf'], histogram.counts):
+                cumulative += count
+                labels = _labels(command=command, prefix=prefix, le=bound, **extra)
+                lines.append(f'bunny_cache_redis_seconds_bucket{{{labels}}} {cumulative}')
+
+            labels = _labels(command=command, prefix=prefix, **extra)
+            lines.append(f'bunny_cache_redis_seconds_sum{{{labels}}} {histogram.sum}')
+            lines.append(f'bunny_cache_redis_seconds_count{{{labels}}} {histogram.count}')
+
+        labels = f'{{{_labels(**extra)}}}' if extra else ''
+        for name, value in (gauges or {}).items():
+            lines += [f'# TYPE {name} gauge', f'{name}{labels} {value}']
+
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(**labels: str) -> str:
+    """格式化 Prometheus 标签"""
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _escape(value: str) -> str:
+    """转义 Prometheus 标签值"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+cache_metrics = CacheMetrics()
@@ -0,0 +1,454 @@
+import asyncio
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi.logger import logger
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from ..exceptions import CacheUnavailableError
+from .base import MISSING, AsyncCache, Cache
+from .breaker import CircuitBreaker
+from .metrics import CacheMetrics, cache_metrics
+from .serializer import Codec, create_codec
+
+
+# 批量写入操作: (命令, key, 值, 过期时间)，命令为 set 或 delete
+WriteOperation = Tuple[str, str, Any, Optional[int]]
+
+# 视为 Redis 不可用的异常，其他异常说明 Redis 仍能正常响应
+_UNAVAILABLE_ERRORS = (RedisConnectionError, RedisTimeoutError, asyncio.TimeoutError)
+
+
+class RedisCache(Cache):
+    """Redis 缓存"""
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        codec: Optional[Codec] = None,
+        metrics: Optional[CacheMetrics] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        """
+        初始化 Redis 缓存
+
+        Args:
+            redis_client: Redis 客户端实例
+            codec: 编解码器，默认使用 JSON 并回退到 pickle
+            metrics: 指标收集器，默认为全局的 cache_metrics
+            breaker: 熔断器，打开期间直接抛出 CacheUnavailableError，为空时使用默认配置
+        """
+        self.redis_client = redis_client
+        self.codec = codec or create_codec()
+        self.metrics = metrics or cache_metrics
+        self.breaker = breaker or CircuitBreaker(metrics=self.metrics)
+
+    def get(self, key: str) -> Any:
+        serialized_value = self._execute('get', key, self.redis_client.get, key)
+        self._count_reads([key], [serialized_value])
+        if serialized_value is None:
+            return None
+
+        try:
+            return self._deserialize(serialized_value)
+        except Exception:
+            self._execute('delete', key, self.redis_client.delete, key)
+            return None
+
+    def get_with_ttl(self, key: str) -> Tuple[Any, Optional[float]]:
+        """获取缓存及剩余过期时间（秒），永不过期时过期时间为 None，不存在时值为 MISSING"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.pttl(key)
+        serialized_value, pttl = self._execute('get', key, pipe.execute)
+        self._count_reads([key], [serialized_value])
+
+        if serialized_value is None:
+            return MISSING, None
+
+        try:
+            value = self._deserialize(serialized_value)
+        except Exception:
+            self._execute('delete', key, self.redis_client.delete, key)
+            return MISSING, None
+
+        return value, (pttl / 1000 if pttl > 0 else None)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        serialized_value = self._serialize(value)
+        if ttl is None:
+            self._execute('set', key, self.redis_client.set, key, serialized_value)
+        else:
+            self._execute('set', key, self.redis_client.setex, key, ttl, serialized_value)
+
+    def delete(self, key: str) -> None:
+        self._execute('delete', key, self.redis_client.delete, key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """使用 MGET 批量获取缓存，不存在的 key 不会出现在结果中"""
+        if not keys:
+            return {}
+
+        serialized_values = self._execute('mget', keys[0], self.redis_client.mget, keys)
+        self._count_reads(keys, serialized_values)
+
+        values, invalid_keys = self._deserialize_many(keys, serialized_values)
+        if invalid_keys:
+            self._execute('delete', invalid_keys[0], self.redis_client.delete, *invalid_keys)
+
+        return values
+
+    def get_many_with_ttl(self, keys: List[str]) -> Dict[str, Tuple[Any, Optional[float]]]:
+        """在一次往返中批量获取缓存及剩余过期时间（秒）"""
+        if not keys:
+            return {}
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.mget(keys)
+        for key in keys:
+            pipe.pttl(key)
+        serialized_values, *pttls = self._execute('mget', keys[0], pipe.execute)
+        self._count_reads(keys, serialized_values)
+
+        values, invalid_keys = self._deserialize_many(keys, serialized_values)
+        if invalid_keys:
+            self._execute('delete', invalid_keys[0], self.redis_client.delete, *invalid_keys)
+
+        return {
+            key: (values[key], pttl / 1000 if pttl > 0 else None)
+            for key, pttl in zip(keys, pttls)
+            if key in values
+        }
+
+    def set_many(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        """使用 pipeline 批量设置缓存"""
+        self.write_many([('set', key, value, ttl) for key, value in mapping.items()])
+
+    def delete_many(self, keys: List[str]) -> None:
+        """批量删除缓存"""
+        if keys:
+            self._execute('delete', keys[0], self.redis_client.delete, *keys)
+
+    def write_many(self, operations: List[WriteOperation]) -> None:
+        """在一次 pipeline 中执行多个写入操作"""
+        if not operations:
+            return
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        for command, key, value, ttl in operations:
+            self._pipe_write(pipe, command, key, value, ttl)
+        self._execute('pipeline', operations[0][1], pipe.execute)
+
+    def _execute(self, command: str, key: str, func: Callable[..., Any], *args: Any) -> Any:
+        """执行 Redis 命令并记录耗时，连接失败或超时计入熔断器"""
+        if not self.breaker.allow():
+            raise CacheUnavailableError()
+
+        try:
+            with self.metrics.timer(command, key):
+                result = func(*args)
+        except _UNAVAILABLE_ERRORS as e:
+            self.breaker.record_failure()
+            raise CacheUnavailableError() from e
+        except Exception:
+            self.breaker.record_success()
+            raise
+
+        self.breaker.record_success()
+        return result
+
+    def _count_reads(self, keys: List[str], serialized_values: List[Optional[bytes]]) -> None:
+        """统计命中和未命中次数"""
+        for key, serialized_value in zip(keys, serialized_values):
+            self.metrics.incr('redis', 'miss' if serialized_value is None else 'hit', key)
+
+    def _pipe_write(
+        self, pipe: Any, command: str, key: str, value: Any, ttl: Optional[int]
+    ) -> None:
+        """向 pipeline 中追加写入命令"""
+        if command == 'delete':
+            pipe.delete(key)
+        elif ttl is None:
+            pipe.set(key, self._serialize(value))
+        else:
+            pipe.setex(key, ttl, self._serialize(value))
+
+    def _deserialize_many(
+        self, keys: List[str], serialized_values: List[Optional[bytes]]
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """批量反序列化，返回成功的值和无法反序列化的 key"""
+        values = {}
+        invalid_keys = []
+
+        for key, serialized_value in zip(keys, serialized_values):
+            if serialized_value is None:
+                continue
+
+            try:
+                values[key] = self._deserialize(serialized_value)
+            except Exception:
+                invalid_keys.append(key)
+
+        return values, invalid_keys
+
+    def _serialize(self, value: Any) -> bytes:
+        """序列化值，写入格式头"""
+        return self.codec.encode(value)
+
+    def _deserialize(self, serialized_value: bytes) -> Any:
+        """根据格式头反序列化值，兼容没有格式头的旧数据"""
+        return self.codec.decode(serialized_value)
+
+
+# 仅当锁仍由自己持有时才删除，避免误删其他进程重新获取的锁
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class AsyncRedisCache(AsyncCache):
+    """异步 Redis 缓存"""
+
+    _serialize = RedisCache._serialize
+    _deserialize = RedisCache._deserialize
+    _deserialize_many = RedisCache._deserialize_many
+    _pipe_write = RedisCache._pipe_write
+    _count_reads = RedisCache._count_reads
+
+    def __init__(
+        self,
+        redis_client: AsyncRedis,
+        codec: Optional[Codec] = None,
+        metrics: Optional[CacheMetrics] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        """
+        初始化异步 Redis 缓存
+
+        Args:
+            redis_client: redis.asyncio 客户端实例
+            codec: 编解码器，默认使用 JSON 并回退到 pickle
+            metrics: 指标收集器，默认为全局的 cache_metrics
+            breaker: 熔断器，打开期间直接抛出 CacheUnavailableError 并在后台探测恢复，
+                为空时使用默认配置
+        """
+        self.redis_client = redis_client
+        self.codec = codec or create_codec()
+        self.metrics = metrics or cache_metrics
+        self.breaker = breaker or CircuitBreaker(metrics=self.metrics)
+        self._probe: Optional[asyncio.Task] = None
+
+    async def get(self, key: str) -> Any:
+        serialized_value = await self._execute('get', key, self.redis_client.get, key)
+        self._count_reads([key], [serialized_value])
+        if serialized_value is None:
+            return None
+
+        try:
+            return self._deserialize(serialized_value)
+        except Exception:
+            await self._execute('delete', key, self.redis_client.delete, key)
+            return None
+
+    async def get_with_ttl(self, key: str) -> Tuple[Any, Optional[float]]:
+        """获取缓存及剩余过期时间（秒），永不过期时过期时间为 None，不存在时值为 MISSING"""
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.pttl(key)
+            serialized_value, pttl = await self._execute('get', key, pipe.execute)
+        self._count_reads([key], [serialized_value])
+
+        if serialized_value is None:
+            return MISSING, None
+
+        try:
+            value = self._deserialize(serialized_value)
+        except Exception:
+            await self._execute('delete', key, self.redis_client.delete, key)
+            return MISSING, None
+
+        return value, (pttl / 1000 if pttl > 0 else None)
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        serialized_value = self._serialize(value)
+        if ttl is None:
+            await self._execute('set', key, self.redis_client.set, key, serialized_value)
+        else:
+            await self._execute('set', key, self.redis_client.setex, key, ttl, serialized_value)
+
+    async def delete(self, key: str) -> None:
+        await self._execute('delete', key, self.redis_client.delete, key)
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """使用 MGET 批量获取缓存，不存在的 key 不会出现在结果中"""
+        if not keys:
+            return {}
+
+        serialized_values = await self._execute('mget', keys[0], self.redis_client.mget, keys)
+        self._count_reads(keys, serialized_values)
+
+        values, invalid_keys = self._deserialize_many(keys, serialized_values)
+        if invalid_keys:
+            await self._execute('delete', invalid_keys[0], self.redis_client.delete, *invalid_keys)
+
+        return values
+
+    async def get_many_with_ttl(self, keys: List[str]) -> Dict[str, Tuple[Any, Optional[float]]]:
+        """在一次往返中批量获取缓存及剩余过期时间（秒）"""
+        if not keys:
+            return {}
+
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.mget(keys)
+            for key in keys:
+                pipe.pttl(key)
+            serialized_values, *pttls = await self._execute('mget', keys[0], pipe.execute)
+        self._count_reads(keys, serialized_values)
+
+        values, invalid_keys = self._deserialize_many(keys, serialized_values)
+        if invalid_keys:
+            await self._execute('delete', invalid_keys[0], self.redis_client.delete, *invalid_keys)
+
+        return {
+            key: (values[key], pttl / 1000 if pttl > 0 else None)
+            for key, pttl in zip(keys, pttls)
+            if key in values
+        }
+
+    async def set_many(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        """使用 pipeline 批量设置缓存"""
+        await self.write_many([('set', key, value, ttl) for key, value in mapping.items()])
+
+    async def delete_many(self, keys: List[str]) -> None:
+        """批量删除缓存"""
+        if keys:
+            await self._execute('delete', keys[0], self.redis_client.delete, *keys)
+
+    async def write_many(self, operations: List[WriteOperation]) -> None:
+        """在一次 pipeline 中执行多个写入操作"""
+        if not operations:
+            return
+
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for command, key, value, ttl in operations:
+                self._pipe_write(pipe, command, key, value, ttl)
+            await self._execute('pipeline', operations[0][1], pipe.execute)
+
+    async def scan(self, match: str, count: int = 1000) -> List[str]:
+        """使用 SCAN 获取匹配的 key，不会像 KEYS 一样长时间阻塞 Redis"""
+        keys = []
+        cursor = 0
+
+        while True:
+            cursor, batch = await self._execute(
+                'scan', match, partial(self.redis_client.scan, match=match, count=count), cursor
+            )
+            keys.extend(key.decode() if isinstance(key, bytes) else key for key in batch)
+            if not cursor:
+                return keys
+
+    async def acquire_lock(self, key: str, token: str, timeout: float) -> bool:
+        """
+        获取分布式锁
+
+        Args:
+            key: 锁的 key
+            token: 持有者标识，释放时校验
+            timeout: 锁的过期时间（秒）
+
+        Returns:
+            是否获取成功
+        """
+        return bool(
+            await self._execute(
+                'lock',
+                key,
+                partial(self.redis_client.set, nx=True, px=int(timeout * 1000)),
+                key,
+                token,
+            )
+        )
+
+    async def release_lock(self, key: str, token: str) -> None:
+        """释放分布式锁"""
+        await self._execute(
+            'unlock', key, self.redis_client.eval, _RELEASE_LOCK_SCRIPT, 1, key, token
+        )
+
+    async def close(self) -> None:
+        """停止探测并关闭连接池"""
+        if self._probe is not None:
+            probe, self._probe = self._probe, None
+            probe.cancel()
+            try:
+                await probe
+            except asyncio.CancelledError:
+                pass
+
+        await self.redis_client.aclose()
+
+    @property
+    def available(self) -> bool:
+        """熔断器是否关闭，打开或后台探测期间的调用会直接失败"""
+        return self._probe is None and not self.breaker.is_open
+
+    async def call(
+        self, command: str, key: str, func: Callable[..., Awaitable[Any]], *args: Any
+    ) -> Any:
+        """
+        在熔断器保护下执行使用同一个 Redis 的其他调用，例如消息总线发布
+
+        Args:
+            command: 命令名称，用作耗时指标标签
+            key: 用于指标标签的 key
+            func: 异步调用
+            args: 调用参数
+
+        Raises:
+            CacheUnavailableError: 熔断器打开，或连接失败、超时
+        """
+        return await self._execute(command, key, func, *args)
+
+    async def _execute(
+        self, command: str, key: str, func: Callable[..., Awaitable[Any]], *args: Any
+    ) -> Any:
+        """执行 Redis 命令并记录耗时，连接失败或超时计入熔断器"""
+        # 后台探测运行期间由探测关闭熔断器，不放行请求作为半开试探，避免请求等待超时
+        if self._probe is not None or not self.breaker.allow():
+            raise CacheUnavailableError()
+
+        try:
+            with self.metrics.timer(command, key):
+                result = await func(*args)
+        except _UNAVAILABLE_ERRORS as e:
+            self.breaker.record_failure()
+            if self.breaker.is_open and self._probe is None:
+                self._probe = asyncio.create_task(self._probe_until_recovered())
+            raise CacheUnavailableError() from e
+        except Exception:
+            self.breaker.record_success()
+            raise
+
+        self.breaker.record_success()
+        return result
+
+    async def _probe_until_recovered(self) -> None:
+        """熔断器打开期间在后台定期 PING，Redis 恢复后关闭熔断器"""
+        try:
+            while self.breaker.is_open:
+                await asyncio.sleep(self.breaker.recovery_timeout)
+                try:
+                    await self.redis_client.ping()
+                except Exception as e:
+                    logger.warning(f'Redis 探测失败: {e}')
+                    continue
+
+                self.breaker.record_success()
+        finally:
+            self._probe = None
@@ -0,0 +1,258 @@
+import json
+import pickle
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class Serializer(ABC):
+    """序列化器基类"""
+
+    format: int = 0  # 格式标识，写入格式头的低 3 位，取值 1-7
+    name: str = ''
+
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        """序列化，不支持的类型抛出 TypeError"""
+        pass
+
+    @abstractmethod
+    def loads(self, data: bytes) -> Any:
+        """反序列化"""
+        pass
+
+
+class JsonSerializer(Serializer):
+    """JSON 序列化器，安装了 orjson 时优先使用"""
+
+    format = 1
+    name = 'json'
+
+    def dumps(self, value: Any) -> bytes:
+        if orjson is not None:
+            # datetime 等类型交给回退序列化器处理，保证读出的类型不变
+            return orjson.dumps(
+                value,
+                option=orjson.OPT_NON_STR_KEYS
+                | orjson.OPT_PASSTHROUGH_DATETIME
+                | orjson.OPT_PASSTHROUGH_DATACLASS
+                | orjson.OPT_PASSTHROUGH_SUBCLASS,
+            )
+
+        try:
+            return json.dumps(value).encode('utf-8')
+        except (ValueError, OverflowError) as e:
+            raise TypeError(str(e))
+
+    def loads(self, data: bytes) -> Any:
+        if orjson is not None:
+            return orjson.loads(data)
+
+        return json.loads(data.decode('utf-8'))
+
+
+class MsgpackSerializer(Serializer):
+    """msgpack 序列化器，需要安装 msgpack"""
+
+    format = 2
+    name = 'msgpack'
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError('使用 msgpack 序列化需要安装 msgpack')
+
+    def dumps(self, value: Any) -> bytes:
+        try:
+            return msgpack.packb(value)
+        except (ValueError, OverflowError) as e:
+            raise TypeError(str(e))
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, strict_map_key=False)
+
+
+class PickleSerializer(Serializer):
+    """pickle 序列化器，仅应在可信的 Redis 中使用"""
+
+    format = 3
+    name = 'pickle'
+
+    def dumps(self, value: Any) -> bytes:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+SERIALIZERS = {
+    JsonSerializer.name: JsonSerializer,
+    MsgpackSerializer.name: MsgpackSerializer,
+    PickleSerializer.name: PickleSerializer,
+}
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+
+COMPRESSIONS = {
+    'zlib': COMPRESSION_ZLIB,
+    'zstd': COMPRESSION_ZSTD,
+}
+
+# 格式头小于 0x20：旧版 JSON 以可打印字符开头，旧版 pickle 以 0x80 开头，二者不会冲突
+_HEADER_LIMIT = 0x20
+
+
+class Codec:
+    """
+    带格式头的编解码器
+
+    编码结果的第一个字节为格式头：低 3 位为序列化格式，高位为压缩算法，
+    没有格式头的旧数据按 JSON、pickle 的顺序尝试解码
+    """
+
+    def __init__(
+        self,
+        serializer: Optional[Serializer] = None,
+        fallback: Optional[Serializer] = None,
+        compression: Optional[str] = None,
+        compress_threshold: int = 1024,
+        allow_pickle: bool = True,
+    ):
+        """
+        初始化编解码器
+
+        Args:
+            serializer: 序列化器，默认为 JSON
+            fallback: serializer 不支持该类型时使用的序列化器，为空时直接抛出异常
+            compression: 压缩算法 zlib / zstd，为空时不压缩
+            compress_threshold: 序列化后超过该字节数才压缩
+            allow_pickle: 是否允许解码 pickle 数据，关闭后 Redis 中的 pickle 数据无法被读取
+        """
+        self.serializer = serializer or JsonSerializer()
+        self.fallback = fallback
+        self.compression = COMPRESSIONS[compression] if compression else COMPRESSION_NONE
+        self.compress_threshold = compress_threshold
+        self.allow_pickle = allow_pickle
+
+        if self.compression == COMPRESSION_ZSTD:
+            if zstandard is None:
+                raise ImportError('使用 zstd 压缩需要安装 zstandard')
+            self._zstd_compressor = zstandard.ZstdCompressor()
+
+        self.serializers: Dict[int, Serializer] = {JsonSerializer.format: JsonSerializer()}
+        for serializer in (self.serializer, self.fallback):
+            if serializer is not None:
+                self.serializers[serializer.format] = serializer
+        if allow_pickle:
+            self.serializers.setdefault(PickleSerializer.format, PickleSerializer())
+        else:
+            self.serializers.pop(PickleSerializer.format, None)
+
+    def encode(self, value: Any) -> bytes:
+        serializer = self.serializer
+
+        try:
+            data = serializer.dumps(value)
+        except TypeError:
+            if self.fallback is None:
+                raise
+            serializer = self.fallback
+            data = serializer.dumps(value)
+
+        compression = COMPRESSION_NONE
+        if self.compression and len(data) >= self.compress_threshold:
+            compressed = self._compress(data)
+            if len(compressed) < len(data):
+                data = compressed
+                compression = self.compression
+
+        return bytes((serializer.format | compression << 3,)) + data
+
+    def decode(self, data: bytes) -> Any:
+        if not data or data[0] >= _HEADER_LIMIT:
+            return self._decode_legacy(data)
+
+        serializer = self.serializers.get(data[0] & 0x07)
+        if serializer is None:
+            raise ValueError(f'Unsupported serialization format: {data[0] & 0x07}')
+
+        return serializer.loads(self._decompress(data[0] >> 3, data[1:]))
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.compression == COMPRESSION_ZSTD:
+            return self._zstd_compressor.compress(data)
+
+        return zlib.compress(data)
+
+    def _decompress(self, compression: int, data: bytes) -> bytes:
+        if compression == COMPRESSION_NONE:
+            return data
+
+        if compression == COMPRESSION_ZLIB:
+            return zlib.decompress(data)
+
+        if compression == COMPRESSION_ZSTD:
+            if zstandard is None:
+                raise ValueError('Decompressing zstd data requires zstandard')
+            return zstandard.ZstdDecompressor().decompress(data)
+
+        raise ValueError(f'Unsupported compression: {compression}')
+
+    def _decode_legacy(self, data: bytes) -> Any:
+        """解码迁移前写入的无格式头数据"""
+        try:
+            return json.loads(data.decode('utf-8'))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            if not self.allow_pickle:
+                raise ValueError('Failed to deserialize value with JSON')
+
+            try:
+                return pickle.loads(data)
+            except pickle.UnpicklingError:
+                raise ValueError('Failed to deserialize value with both JSON and pickle')
+
+
+def create_codec(
+    serializer: str = 'json',
+    compression: Optional[str] = None,
+    compress_threshold: int = 1024,
+    allow_pickle: bool = True,
+) -> Codec:
+    """
+    根据配置创建编解码器
+
+    Args:
+        serializer: 序列化格式 json / msgpack / pickle
+        compression: 压缩算法 zlib / zstd，为空时不压缩
+        compress_threshold: 序列化后超过该字节数才压缩
+        allow_pickle: 是否允许 pickle，允许时不支持的类型会回退到 pickle
+    """
+    if serializer not in SERIALIZERS:
+        raise ValueError(f'Unknown serializer: {serializer}')
+
+    if serializer == PickleSerializer.name and not allow_pickle:
+        raise ValueError('Pickle serializer requires allow_pickle')
+
+    return Codec(
+        serializer=SERIALIZERS[serializer](),
+        fallback=PickleSerializer() if allow_pickle and serializer != 'pickle' else None,
+        compression=compression or None,
+        compress_threshold=compress_threshold,
+        allow_pickle=allow_pickle,
+    )
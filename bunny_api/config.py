@@ -62,10 +62,46 @@ class BunnyConfig(BaseSettings):
     redis_port: int = 6379
     redis_db: int = 0
     redis_password: str | None = None
-
-    admin_token_secret_key: str
+    redis_max_connections: int = 50  # 异步连接池最大连接数
+    redis_pool_timeout: int = 5  # 连接池耗尽时等待空闲连接的秒数
+    redis_socket_connect_timeout: float = 1  # 建立连接的超时时间（秒）
+    redis_socket_timeout: float = 1  # 读写的超时时间（秒）
+    redis_retries: int = 0  # 连接失败或超时后立即重试的次数，为 0 时一次失败只花费一次超时
+    redis_breaker_failure_threshold: int = 5  # 连续失败多少次后打开熔断器
+    redis_breaker_recovery_timeout: float = 10  # 熔断器打开后探测 Redis 的间隔（秒）
+    redis_serializer: str = 'json'  # Redis 值的序列化格式 json / msgpack / pickle
+    redis_compression: str | None = 'zlib'  # 压缩算法 zlib / zstd，为空时不压缩
+    redis_compress_threshold: int = 1024  # 序列化后超过该字节数才压缩
+    redis_allow_pickle: bool = True  # 是否允许 pickle，共享的 Redis 建议关闭
+    cache_invalidation_channel: str = 'bunny:cache:invalidate'  # 内存缓存失效广播频道
+    cache_memory_maxsize: int = 10000  # 每个 worker 内存缓存的最大条目数
+    cache_memory_max_bytes: int | None = 64 * 1024 * 1024  # 每个 worker 内存缓存的最大字节数
+    cache_negative_ttl: int = 5  # 不存在的 key 在内存中的负缓存时间（秒），为 0 时不缓存
+    user_profile_ttl: int = 3600  # 用户资料缓存时间（秒），为 0 时永不过期
+    user_profile_none_ttl: int = 60  # 不存在的用户资料缓存时间（秒），为 0 时不缓存
+    cache_metrics_token: str = ''  # 采集 /admin/cache/metrics 的 Bearer token
+    cache_metrics_allow_ips: str = ''  # 允许采集缓存指标的客户端 IP，逗号分隔，都为空时不开放
+    rbac_reload_interval: int = 600  # 定期全量重新加载权限快照的间隔（秒），为 0 时不重新加载
+    pagination_count_cache_ttl: int = 30  # 分页总数的缓存时间（秒），为 0 时不缓存
+    operation_log_batch_size: int = 200  # 操作日志每批写入的条数
+    operation_log_flush_interval: float = 0.5  # 操作日志最长的写入间隔（秒）
+    operation_log_queue_size: int = 10000  # 操作日志队列容量，队列满时写入溢出文件
+    operation_log_spill_path: str = 'operation_log.spill'  # 溢出文件路径，为空时丢弃
+    operation_log_default_policy: str = 'always'  # 默认日志策略 always/failure/sample:0.1/never
+    operation_log_policies: str = ''  # 路由日志策略，例如 login=always,menu.*=sample:0.1
+    operation_log_body_max_bytes: int = 8192  # 记录的请求体最大字节数，超出时只记录大小
+    operation_log_redact_fields: str = 'password,old_password,refresh_token'  # 脱敏字段，逗号分隔
+
+    admin_token_secret_key: str = ''  # HS256 密钥，设置私钥后只用于验证切换前签发的 token
+    admin_token_private_key_file: str = ''  # 签名私钥 PEM 文件（Ed25519 / P-256 / RSA）
+    admin_token_public_key_files: str = ''  # 轮换期间额外接受的公钥 PEM 文件，逗号分隔
     admin_token_expires_seconds: int = 86400
     admin_token_sso: bool = False
+    admin_token_fail_open: bool = True  # Redis 不可用时是否放行无法确认黑名单状态的 token
+    admin_token_cache_size: int = 10000  # 每个 worker 缓存的已验证 token 数量，为 0 时不缓存
+    admin_token_revocation_capacity: int = 100000  # 撤销记录布隆过滤器容量，为 0 时每次读取
+    admin_token_refresh_expires_seconds: int = 0  # refresh token 有效期，大于 0 时启用轮换
+    admin_token_access_expires_seconds: int = 300  # 启用 refresh token 时 access token 的有效期
 
     extra_models: str = ''
 
@@ -34,6 +34,13 @@ class PermissionError(BunnyException):
         super().__init__(code=BunnyResponseConfig.PERMISSION_DENIED)
 
 
+class CacheUnavailableError(BunnyException):
+    """缓存服务不可用"""
+
+    def __init__(self, msg: str = '缓存服务不可用'):
+        super().__init__(msg)
+
+
 async def bunny_exception_handler(request: Request, exc: BunnyException):
     """
     Bunny 异常处理
@@ -0,0 +1,175 @@
+import base64
+import json
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Iterable
+
+from jwt import InvalidTokenError, decode, encode, get_unverified_header
+from jwt.algorithms import get_default_algorithms
+
+try:
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+    from cryptography.hazmat.primitives.serialization import (
+        load_pem_private_key,
+        load_pem_public_key,
+    )
+except ImportError:
+    ec = ed25519 = rsa = None
+
+# RFC 7638 计算 JWK 指纹时使用的字段
+THUMBPRINT_MEMBERS = ('crv', 'e', 'kty', 'n', 'x', 'y')
+
+
+def key_algorithm(public_key: Any) -> str:
+    """
+    根据公钥类型确定签名算法
+
+    Args:
+        public_key: cryptography 公钥
+
+    Returns:
+        EdDSA / ES256 / RS256
+    """
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        return 'EdDSA'
+
+    if isinstance(public_key, ec.EllipticCurvePublicKey):
+        if public_key.curve.name != 'secp256r1':
+            raise ValueError(f'ES256 需要 P-256 曲线，当前为 {public_key.curve.name}')
+        return 'ES256'
+
+    if isinstance(public_key, rsa.RSAPublicKey):
+        return 'RS256'
+
+    raise ValueError(f'不支持的密钥类型: {type(public_key).__name__}')
+
+
+def key_jwk(public_key: Any) -> dict:
+    """
+    将公钥导出为 JWK，kid 为 RFC 7638 指纹
+
+    Args:
+        public_key: cryptography 公钥
+
+    Returns:
+        JWK 字典
+    """
+    algorithm = key_algorithm(public_key)
+    jwk = get_default_algorithms()[algorithm].to_jwk(public_key, as_dict=True)
+
+    members = {name: jwk[name] for name in THUMBPRINT_MEMBERS if name in jwk}
+    canonical = json.dumps(members, separators=(',', ':'), sort_keys=True).encode()
+    kid = base64.urlsafe_b64encode(sha256(canonical).digest()).rstrip(b'=').decode()
+
+    return {**jwk, 'kid': kid, 'alg': algorithm, 'use': 'sig'}
+
+
+class KeySet:
+    """
+    token 签名密钥集合
+
+    使用一个密钥签名，签发的 token 头部带有 kid；验证时按 kid 查找公钥，
+    轮换期间旧公钥继续保留，已签发的 token 无需重新登录。
+    没有 kid 的 token 使用 HS256 共享密钥验证，兼容切换前签发的 token
+    """
+
+    def __init__(
+        self,
+        secret_key: str = '',
+        private_key: Any = None,
+        public_keys: Iterable[Any] = (),
+    ):
+        """
+        初始化密钥集合
+
+        Args:
+            secret_key: HS256 共享密钥，未设置私钥时用于签名
+            private_key: 签名私钥（Ed25519 / P-256 / RSA），为空时使用 HS256 签名
+            public_keys: 额外的验证公钥，例如轮换前的旧公钥或即将启用的新公钥
+        """
+        if (private_key is not None or public_keys) and rsa is None:
+            raise ImportError('使用非对称签名需要安装 pyjwt[crypto]')
+
+        self.secret_key = secret_key
+        self.private_key = private_key
+        self.verify_keys: dict[str, tuple[str, Any]] = {}
+        self.jwks: dict = {'keys': []}  # 公开的 JWKS，初始化时计算一次
+
+        if private_key is not None:
+            public_keys = [private_key.public_key(), *public_keys]
+
+        for public_key in public_keys:
+            jwk = key_jwk(public_key)
+            if jwk['kid'] in self.verify_keys:
+                continue
+            self.verify_keys[jwk['kid']] = (jwk['alg'], public_key)
+            self.jwks['keys'].append(jwk)
+
+        if private_key is not None:
+            self.kid: str | None = self.jwks['keys'][0]['kid']
+            self.algorithm = self.jwks['keys'][0]['alg']
+        else:
+            if not secret_key:
+                raise ValueError('未设置签名私钥时必须设置 secret_key')
+            self.kid = None
+            self.algorithm = 'HS256'
+
+    def sign(self, payload: dict) -> str:
+        """签发 token"""
+        if self.kid is None:
+            return encode(payload, self.secret_key, algorithm=self.algorithm)
+
+        return encode(
+            payload, self.private_key, algorithm=self.algorithm, headers={'kid': self.kid}
+        )
+
+    def decode(self, token: str) -> dict:
+        """
+        按 kid 选择密钥，校验签名并解析载荷
+
+        Raises:
+            InvalidTokenError: token 无效或 kid 未知
+        """
+        kid = get_unverified_header(token).get('kid')
+
+        if kid is None:
+            if not self.secret_key:
+                raise InvalidTokenError('未设置 secret_key，无法验证 HS256 token')
+            return decode(token, self.secret_key, algorithms=['HS256'])
+
+        if kid not in self.verify_keys:
+            raise InvalidTokenError(f'未知的 kid: {kid}')
+
+        # 每个 kid 只接受对应密钥的算法，防止算法混淆
+        algorithm, public_key = self.verify_keys[kid]
+        return decode(token, public_key, algorithms=[algorithm])
+
+
+def load_key_set(
+    secret_key: str = '',
+    private_key_file: str = '',
+    public_key_files: str = '',
+) -> KeySet:
+    """
+    从 PEM 文件加载密钥集合
+
+    Args:
+        secret_key: HS256 共享密钥
+        private_key_file: 签名私钥 PEM 文件路径，为空时使用 HS256
+        public_key_files: 额外验证公钥的 PEM 文件路径，逗号分隔
+
+    Returns:
+        KeySet
+    """
+    private_key = None
+    paths = [path.strip() for path in public_key_files.split(',') if path.strip()]
+
+    if (private_key_file or paths) and rsa is None:
+        raise ImportError('使用非对称签名需要安装 pyjwt[crypto]')
+
+    if private_key_file:
+        private_key = load_pem_private_key(Path(private_key_file).read_bytes(), password=None)
+
+    public_keys = [load_pem_public_key(Path(path).read_bytes()) for path in paths]
+
+    return KeySet(secret_key, private_key, public_keys)
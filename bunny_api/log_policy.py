@@ -0,0 +1,122 @@
+import random
+from fnmatch import fnmatchcase
+from typing import Iterable
+
+from fastapi.logger import logger
+from starlette.routing import BaseRoute
+
+from .config import BUNNY_CONFIG
+
+ALWAYS = 'always'  # 全部记录
+FAILURE = 'failure'  # 只记录失败的请求
+SAMPLE = 'sample'  # 失败的请求全部记录，成功的请求按比例记录
+NEVER = 'never'  # 不记录
+
+
+class LogPolicy:
+    __slots__ = ('mode', 'rate')
+
+    def __init__(self, mode: str, rate: float = 1.0):
+        """
+        路由的操作日志策略
+
+        Args:
+            mode: always / failure / sample / never
+            rate: sample 模式下成功请求的记录比例，0 到 1 之间
+        """
+        if mode not in (ALWAYS, FAILURE, SAMPLE, NEVER):
+            raise ValueError(f'未知的操作日志策略: {mode}')
+
+        if not 0 <= rate <= 1:
+            raise ValueError(f'采样比例必须在 0 到 1 之间: {rate}')
+
+        self.mode = mode
+        self.rate = rate
+
+    @classmethod
+    def parse(cls, value: str) -> 'LogPolicy':
+        """
+        解析策略字符串
+
+        Args:
+            value: 策略，例如 always、failure、never、sample:0.01
+        """
+        mode, _, rate = value.strip().partition(':')
+
+        return cls(mode, float(rate) if rate else 1.0)
+
+    def should_log(self, is_success: bool) -> bool:
+        if self.mode == ALWAYS:
+            return True
+
+        if self.mode == NEVER:
+            return False
+
+        if not is_success:
+            return True
+
+        return self.mode == SAMPLE and random.random() < self.rate
+
+
+class LogPolicies:
+    """
+    按路由名称查找操作日志策略
+
+    策略在启动时根据路由编译为路由名称到策略的映射，请求中只查一次字典
+    """
+
+    def __init__(self, policies: str = '', default: str = ALWAYS):
+        """
+        初始化操作日志策略
+
+        Args:
+            policies: 路由策略，逗号分隔，例如 login=always,menu.*=sample:0.1，
+                路由名称支持通配符，多个规则匹配时使用第一个
+            default: 没有匹配规则的路由使用的策略
+        """
+        self.rules: list[tuple[str, LogPolicy]] = []
+        for item in policies.split(','):
+            if not item.strip():
+                continue
+
+            pattern, _, value = item.partition('=')
+            self.rules.append((pattern.strip(), LogPolicy.parse(value)))
+
+        self.default = LogPolicy.parse(default)
+        self.table: dict[str, LogPolicy] = {}
+
+    def compile(self, routes: Iterable[BaseRoute]) -> None:
+        """
+        根据路由生成查找表，在注册完所有路由之后调用
+
+        Args:
+            routes: 应用的路由列表
+        """
+        names = {getattr(route, 'name', None) for route in routes} - {None}
+        table = {}
+
+        for pattern, policy in self.rules:
+            matched = [name for name in names if fnmatchcase(name, pattern)]
+            if not matched:
+                logger.warning(f'操作日志策略 {pattern} 没有匹配的路由')
+
+            for name in matched:
+                table.setdefault(name, policy)
+
+        self.table = table
+
+    def get(self, route: str) -> LogPolicy:
+        return self.table.get(route, self.default)
+
+    def captures(self, route: str) -> bool:
+        """路由是否可能记录日志，不记录的路由不需要读取请求体"""
+        return self.get(route).mode != NEVER
+
+    def should_log(self, route: str, is_success: bool) -> bool:
+        return self.get(route).should_log(is_success)
+
+
+log_policies = LogPolicies(
+    BUNNY_CONFIG.operation_log_policies,
+    BUNNY_CONFIG.operation_log_default_policy,
+)
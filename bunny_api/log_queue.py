@@ -0,0 +1,325 @@
+import asyncio
+import glob
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator
+
+from fastapi.logger import logger
+from tortoise import timezone
+from tortoise.transactions import in_transaction
+
+from .config import BUNNY_CONFIG
+from .models.bunny import BunnyOperationLog
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class OperationLogQueue:
+    """
+    操作日志写入队列
+
+    请求只把日志放入内存队列，后台任务每攒够 batch_size 条或每隔 flush_interval 秒批量写入；
+    队列满时请求最多等待 put_timeout 秒，仍然没有空位时写入溢出文件，
+    写入数据库失败的日志同样写入溢出文件，下次启动时重新写入数据库
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 200,
+        flush_interval: float = 0.5,
+        maxsize: int = 10000,
+        put_timeout: float = 0.1,
+        spill_path: str = '',
+        drain_timeout: float = 10,
+    ):
+        """
+        初始化操作日志队列
+
+        Args:
+            batch_size: 每批写入的条数
+            flush_interval: 最长写入间隔（秒）
+            maxsize: 队列容量
+            put_timeout: 队列满时请求等待的时间（秒）
+            spill_path: 溢出文件路径，为空时丢弃无法写入的日志
+            drain_timeout: 关闭时等待队列写完的时间（秒）
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.maxsize = maxsize
+        self.put_timeout = put_timeout
+        self.spill_path = spill_path
+        self.drain_timeout = drain_timeout
+
+        self.records: deque[dict] = deque()
+        self.spilled = 0  # 写入溢出文件的条数
+        self.dropped = 0  # 丢弃的条数
+
+        self._task: asyncio.Task | None = None
+        self._closing = False
+        self._wakeup = asyncio.Event()
+        self._space = asyncio.Event()
+        self._spill_lock = threading.Lock()
+
+    async def start(self) -> None:
+        """写入上次遗留的溢出文件，启动后台写入任务"""
+        await self.replay()
+
+        if self._task is None:
+            self._closing = False
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """写入队列中剩余的日志，超时未写完的写入溢出文件"""
+        if self._task is None:
+            return
+
+        self._closing = True
+        self._wakeup.set()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), self.drain_timeout)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+        self._task = None
+
+        if self.records:
+            records, self.records = list(self.records), deque()
+            await self._spill(records)
+
+    async def put(self, record: dict) -> None:
+        """
+        加入一条日志
+
+        Args:
+            record: BunnyOperationLog 的字段
+        """
+        record.setdefault('created_at', timezone.localtime())
+
+        if self._task is None:
+            # 未启动后台任务时（例如命令行）直接写入
+            await BunnyOperationLog.create(**record)
+            return
+
+        if len(self.records) >= self.maxsize:
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(self._wait_space(), self.put_timeout)
+            except asyncio.TimeoutError:
+                await self._spill([record])
+                return
+
+        self.records.append(record)
+
+        if len(self.records) >= self.batch_size:
+            self._wakeup.set()
+
+    async def replay(self) -> None:
+        """
+        将溢出文件中的日志写入数据库
+
+        溢出文件先被重命名为当前进程的回放文件，多个 worker 同时启动时只有一个会读取到文件，
+        回放期间退出的进程遗留的回放文件由下次启动的 worker 接管
+        """
+        if not self.spill_path:
+            return
+
+        for path in await asyncio.to_thread(self._claim_spill):
+            await self._replay_file(path)
+
+    async def _replay_file(self, path: str) -> None:
+        try:
+            # 无法解析的行（例如进程退出时写了一半）移到 .bad 文件，不影响其他日志
+            lines, records = await asyncio.to_thread(self._read_spill, path)
+
+            for i in range(0, len(lines), self.batch_size):
+                batch = records[i : i + self.batch_size]
+                async with in_transaction():
+                    await BunnyOperationLog.bulk_create([BunnyOperationLog(**r) for r in batch])
+
+                # 每批提交后只保留未写入的日志，失败或进程退出时不会重复写入已提交的批次
+                await asyncio.to_thread(self._rewrite, path, lines[i + self.batch_size :])
+        except Exception as e:
+            # 未写入的日志合并回溢出文件，下次启动时重试
+            logger.error(f'操作日志溢出文件写入失败: {e}')
+            await asyncio.to_thread(self._merge_spill, path)
+            return
+
+        os.remove(path)
+
+    async def _wait_space(self) -> None:
+        while len(self.records) >= self.maxsize:
+            self._space.clear()
+            await self._space.wait()
+
+    async def _run(self) -> None:
+        while not (self._closing and not self.records):
+            if len(self.records) < self.batch_size and not self._closing:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            await self._flush()
+
+    async def _flush(self) -> None:
+        """写入一批日志"""
+        batch = [self.records.popleft() for _ in range(min(self.batch_size, len(self.records)))]
+        if not batch:
+            return
+
+        self._space.set()
+
+        try:
+            await BunnyOperationLog.bulk_create([BunnyOperationLog(**r) for r in batch])
+        except asyncio.CancelledError:
+            self._write_spill(batch)
+            raise
+        except Exception as e:
+            logger.error(f'操作日志写入失败: {e}')
+            await self._spill(batch)
+
+    async def _spill(self, records: list[dict]) -> None:
+        await asyncio.to_thread(self._write_spill, records)
+
+    def _write_spill(self, records: list[dict]) -> None:
+        if not self.spill_path:
+            self.dropped += len(records)
+            logger.error(f'操作日志队列已满，丢弃 {len(records)} 条日志')
+            return
+
+        lines = ''.join(
+            json.dumps({**r, 'created_at': r['created_at'].isoformat()}, ensure_ascii=False) + '\n'
+            for r in records
+        )
+
+        with self._locked(), open(self.spill_path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+
+        self.spilled += len(records)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """
+        溢出文件的跨进程锁，所有 worker 共享同一个溢出文件，追加、接管和合并都需要持有
+
+        不支持 fcntl 的平台只在进程内加锁
+        """
+        with self._spill_lock:
+            if fcntl is None:
+                yield
+                return
+
+            with open(f'{self.spill_path}.lock', 'a') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _claim_spill(self) -> list[str]:
+        """接管溢出文件和已退出进程遗留的回放文件，返回需要回放的文件"""
+        paths = []
+
+        with self._locked():
+            for path in glob.glob(f'{glob.escape(self.spill_path)}.replay.*'):
+                pid = path.rsplit('.replay.', 1)[1].split('.', 1)[0]
+                if pid.isdigit() and not _pid_alive(int(pid)) and not path.endswith('.tmp'):
+                    paths.append(path)
+
+            path = f'{self.spill_path}.replay.{os.getpid()}.{time.time_ns()}'
+            try:
+                os.replace(self.spill_path, path)
+                paths.append(path)
+            except FileNotFoundError:
+                pass
+
+        return paths
+
+    def _read_spill(self, path: str) -> tuple[list[str], list[dict]]:
+        """读取回放文件，返回可以解析的行和对应的日志，无法解析的行追加到 .bad 文件"""
+        lines = []
+        records = []
+        bad = []
+
+        with open(path, encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+
+                try:
+                    record = json.loads(line)
+                    record['created_at'] = datetime.fromisoformat(record['created_at'])
+                except Exception:
+                    bad.append(line if line.endswith('\n') else line + '\n')
+                    continue
+
+                lines.append(line)
+                records.append(record)
+
+        if bad:
+            logger.error(
+                f'操作日志溢出文件中有 {len(bad)} 行无法解析，已移到 {self.spill_path}.bad'
+            )
+            with self._locked(), open(f'{self.spill_path}.bad', 'a', encoding='utf-8') as f:
+                f.writelines(bad)
+
+            # 从回放文件中移除，失败重试时不会再次写入 .bad 文件
+            self._rewrite(path, lines)
+
+        return lines, records
+
+    def _rewrite(self, path: str, lines: list[str]) -> None:
+        """原子地替换文件内容"""
+        tmp = f'{path}.tmp'
+
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+
+        os.replace(tmp, path)
+
+    def _merge_spill(self, path: str) -> None:
+        """将未能写入的文件合并回溢出文件"""
+        with open(path, encoding='utf-8') as src:
+            content = src.read()
+
+        with self._locked(), open(self.spill_path, 'a', encoding='utf-8') as f:
+            f.write(content)
+
+        os.remove(path)
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # 进程存在但属于其他用户
+        return True
+
+    return True
+
+
+operation_log_queue = OperationLogQueue(
+    batch_size=BUNNY_CONFIG.operation_log_batch_size,
+    flush_interval=BUNNY_CONFIG.operation_log_flush_interval,
+    maxsize=BUNNY_CONFIG.operation_log_queue_size,
+    spill_path=BUNNY_CONFIG.operation_log_spill_path,
+)
@@ -6,7 +6,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from tortoise import Tortoise
 from tortoise.exceptions import BaseORMException
 
-from .api import adminRouter, adminRouterWithAuth
+from .api import adminRouter, adminRouterWithAuth, metricsRouter
+from .cache import async_bunny_cache
 from .config import TORTOISE_ORM, BUNNY_CONFIG
 from .exceptions import (
     BunnyException,
@@ -14,7 +15,11 @@ from .exceptions import (
     tortoise_exception_handler,
     validation_exception_handler,
 )
+from .log_policy import log_policies
+from .log_queue import operation_log_queue
 from .middlewares import OperationLogMiddleware
+from .rbac import rbac
+from .token import admin_bunny_token
 from .utils import str2list
 
 
@@ -22,8 +27,14 @@ def create_app():
     @asynccontextmanager
     async def lifespan(app: FastAPI):
         await Tortoise.init(TORTOISE_ORM)
+        await async_bunny_cache.start()
+        await admin_bunny_token.start()
+        await rbac.load()
+        await operation_log_queue.start()
         yield
+        await operation_log_queue.close()
         await Tortoise.close_connections()
+        await async_bunny_cache.close()
 
     app = FastAPI(title='Bunny API', lifespan=lifespan)
 
@@ -39,6 +50,10 @@ def create_app():
 
     app.include_router(adminRouter)
     app.include_router(adminRouterWithAuth)
+    app.include_router(metricsRouter)
+
+    # 注册完路由后生成日志策略查找表
+    log_policies.compile(app.routes)
 
     app.add_exception_handler(BunnyException, bunny_exception_handler)
     app.add_exception_handler(RequestValidationError, validation_exception_handler)
@@ -3,13 +3,17 @@ from .auth import (
     operation_log,
     permission_check,
     set_log_body,
+    set_log_redact_fields,
+    verify_metrics_access,
     verify_token,
 )
 
 __all__ = [
     'verify_token',
+    'verify_metrics_access',
     'permission_check',
     'set_log_body',
+    'set_log_redact_fields',
     'operation_log',
     'OperationLogMiddleware',
 ]
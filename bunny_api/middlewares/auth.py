@@ -1,13 +1,18 @@
+import hmac
 import json
+from typing import Any, Iterable
 
 from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from ..config import BUNNY_CONFIG
 from ..exceptions import AuthenticationError, PermissionError
-from ..models.bunny import BunnyOperationLog, BunnyUser
+from ..log_policy import log_policies
+from ..log_queue import operation_log_queue
 from ..permission import Permission
+from ..profile import UserProfile
 from ..token import admin_bunny_token
-from ..utils import get_real_ip
+from ..utils import get_real_ip, str2list
 
 
 async def verify_token(request: Request):
@@ -18,7 +23,12 @@ async def verify_token(request: Request):
 
     token = token.replace('Bearer', '').strip()
 
-    user_id = admin_bunny_token.verify(token)
+    user_id = await admin_bunny_token.verify(token)
+
+    # 用户资料有缓存，禁用或删除的用户不需要查询数据库即可拒绝
+    profile = await UserProfile.get(user_id)
+    if not profile or not profile['is_active']:
+        raise AuthenticationError()
 
     request.state.user_id = user_id
 
@@ -35,42 +45,149 @@ async def permission_check(request: Request):
         raise PermissionError()
 
 
+async def verify_metrics_access(request: Request):
+    """
+    校验指标采集请求，采集器不使用管理员账号
+
+    设置了 cache_metrics_allow_ips 时按连接的客户端地址校验，不信任 X-Real-IP 等请求头；
+    设置了 cache_metrics_token 时校验 Bearer token；两者都为空时拒绝所有请求
+    """
+    allow_ips = str2list(BUNNY_CONFIG.cache_metrics_allow_ips)
+    token = BUNNY_CONFIG.cache_metrics_token
+
+    if not allow_ips and not token:
+        raise PermissionError()
+
+    if allow_ips and (request.client is None or request.client.host not in allow_ips):
+        raise PermissionError()
+
+    if token:
+        authorization = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(authorization.replace('Bearer', '').strip(), token):
+            raise AuthenticationError()
+
+
+REDACTED = '******'
+
+# 所有路由默认脱敏的字段
+default_redact_fields = frozenset(
+    field.strip() for field in BUNNY_CONFIG.operation_log_redact_fields.split(',') if field.strip()
+)
+
+# 路由名称 -> 该路由的脱敏字段
+route_redact_fields: dict[str, frozenset[str]] = {}
+
+
+def set_log_redact_fields(route: str, fields: Iterable[str]) -> None:
+    """
+    设置路由额外的脱敏字段，与默认脱敏字段合并
+
+    Args:
+        route: 路由名称
+        fields: 字段名称，嵌套对象和数组中的同名字段同样会被脱敏
+    """
+    route_redact_fields[route] = default_redact_fields | frozenset(fields)
+
+
+def redact(content: Any, fields: frozenset[str]) -> Any:
+    if isinstance(content, dict):
+        return {
+            key: REDACTED if key in fields else redact(value, fields)
+            for key, value in content.items()
+        }
+
+    if isinstance(content, list):
+        return [redact(value, fields) for value in content]
+
+    return content
+
+
+class LogBody:
+    """
+    请求体原始数据，写入日志时才解析
+
+    超过 max_bytes 的请求体不保留，日志中只记录大小
+    """
+
+    __slots__ = ('raw', 'size')
+
+    def __init__(self, raw: bytes, size: int):
+        self.raw = raw
+        self.size = size
+
+    def content(self, route: str) -> Any:
+        """
+        解析并脱敏请求体
+
+        Args:
+            route: 路由名称，用于获取脱敏字段
+
+        Returns:
+            写入日志的内容
+        """
+        if self.size > len(self.raw):
+            return {'truncated': True, 'size': self.size}
+
+        if not self.raw:
+            return {}
+
+        try:
+            content = json.loads(self.raw)
+        except Exception:
+            return {}
+
+        return redact(content, route_redact_fields.get(route, default_redact_fields))
+
+
 async def set_log_body(request: Request):
-    if request.method != 'GET':
-        body = await request.body()
+    if request.method != 'GET' and log_policies.captures(request.scope['route'].name or ''):
+        max_bytes = BUNNY_CONFIG.operation_log_body_max_bytes
 
-        if body:
-            try:
-                request.state.log_content = json.loads(body)
-            except Exception:
-                request.state.log_content = {}
-        else:
-            request.state.log_content = {}
+        # Content-Length 已经超出时不读取请求体
+        length = request.headers.get('content-length')
+        if length and length.isdigit() and int(length) > max_bytes:
+            request.state.log_content = LogBody(b'', int(length))
+            return
+
+        body = await request.body()
+        request.state.log_content = LogBody(body if len(body) <= max_bytes else b'', len(body))
 
 
 async def operation_log(request: Request, call_next):
     response: Response = await call_next(request)
 
     if hasattr(request.state, 'log_content'):
-        path = request.url.path
-        route = request.scope['route'].name or ''
-        method = request.method
-        ip = get_real_ip(request)
-        content = request.state.log_content
         is_success = response.status_code == 200 and 'Bunny-Error' not in response.headers
+        await save_operation_log(request, is_success)
 
-        user_id = 0
-        if hasattr(request.state, 'user_id'):
-            user_id = request.state.user_id
+    return response
 
-        username = ''
-        nickname = ''
-        if user_id > 0:
-            user = await BunnyUser.get(id=user_id)
-            username = user.username
-            nickname = user.nickname
 
-        await BunnyOperationLog.create(
+async def save_operation_log(request: Request, is_success: bool) -> None:
+    route = request.scope['route'].name or ''
+    if not log_policies.should_log(route, is_success):
+        return
+
+    path = request.url.path
+    method = request.method
+    ip = get_real_ip(request)
+    content = request.state.log_content.content(route)
+
+    user_id = 0
+    if hasattr(request.state, 'user_id'):
+        user_id = request.state.user_id
+
+    username = ''
+    nickname = ''
+    if user_id > 0:
+        profile = await UserProfile.get(user_id)
+        if profile:
+            username = profile['username']
+            nickname = profile['nickname']
+
+    # 放入写入队列，不在请求中等待数据库写入
+    await operation_log_queue.put(
+        dict(
             user_id=user_id,
             username=username,
             nickname=nickname,
@@ -81,10 +198,39 @@ async def operation_log(request: Request, call_next):
             content=content,
             is_success=is_success,
         )
+    )
 
-    return response
 
+class OperationLogMiddleware:
+    """
+    操作日志中间件
+
+    纯 ASGI 实现，只从 http.response.start 中读取状态码和响应头，不包装响应体，
+    响应发送完成后再写入日志
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = 0
+        has_error = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, has_error
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                has_error = any(
+                    name.lower() == b'bunny-error' for name, _ in message.get('headers', ())
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
 
-class OperationLogMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        return await operation_log(request, call_next)
+        # set_log_body 通过 request.state 标记需要记录的请求，state 保存在 scope 中
+        if 'log_content' in scope.get('state', ()):
+            await save_operation_log(Request(scope), status == 200 and not has_error)
@@ -1,57 +1,69 @@
-import time
+from typing import Iterable
 
-from .cache import bunny_cache
-from .models import BunnyRolePermission, BunnyUserRole
 from .models.bunny import BunnyMenu
+from .rbac import PermissionRegistry, PermissionSet, rbac
 
 
 class Permission:
     @staticmethod
-    def get_flag() -> int:
-        flag = bunny_cache.get_memory('permission:flag')
+    async def refresh() -> None:
+        # 绕过服务直接修改了权限数据时使用，通知所有 worker 全量重新加载
+        await rbac.reload_all()
 
-        if not flag:
-            flag = time.time()
-            bunny_cache.set_memory('permission:flag', flag)
+    @staticmethod
+    async def invalidate_role(role_id: int) -> None:
+        # 只重新读取该角色，其他角色和用户不受影响
+        await rbac.invalidate_role(role_id)
 
-        return int(flag)
+    @staticmethod
+    async def invalidate_user(user_id: int) -> None:
+        await rbac.invalidate_user(user_id)
 
     @staticmethod
-    def refresh() -> None:
-        bunny_cache.set_memory('permission:flag', time.time())
+    async def invalidate_menus(ids: list[int]) -> None:
+        await rbac.invalidate_menus(ids)
+
+    @staticmethod
+    async def get_registry() -> PermissionRegistry:
+        """获取权限 ID 映射"""
+        await rbac.ensure_loaded()
+        return rbac.registry
 
     @staticmethod
     async def check_permission(user_id: int, permission: str) -> bool:
         if user_id == 1:
             return True
 
-        permissions = await Permission.get_user_permissions(user_id, Permission.get_flag())
+        permissions = await Permission.get_user_permissions(user_id)
 
         return permission in permissions
 
     @staticmethod
-    async def get_user_permissions(user_id: int, flag: int) -> list[str]:
-        cache_key = f'permission:user:{user_id}:{flag}'
+    async def has_all(user_id: int, permissions: Iterable[str]) -> bool:
+        """用户是否拥有全部权限"""
+        if user_id == 1:
+            return True
 
-        permissions = bunny_cache.get_memory(cache_key)
+        user_permissions = await Permission.get_user_permissions(user_id)
 
-        if permissions is not None:
-            return permissions
+        return user_permissions.has_all(permissions)
 
+    @staticmethod
+    async def has_any(user_id: int, permissions: Iterable[str]) -> bool:
+        """用户是否拥有任意一个权限"""
         if user_id == 1:
-            permissions = await BunnyMenu.all().values_list('permission', flat=True)
-        else:
-            role_ids = await BunnyUserRole.filter(user_id=user_id).values_list('role_id', flat=True)
+            return True
 
-            if not role_ids:
-                permissions = []
-            else:
-                permissions = await BunnyRolePermission.filter(role_id__in=role_ids).values_list(
-                    'permission', flat=True
-                )
+        user_permissions = await Permission.get_user_permissions(user_id)
 
-                permissions = list(set(permissions))
+        return user_permissions.has_any(permissions)
 
-        bunny_cache.set_memory(cache_key, permissions)
+    @staticmethod
+    async def get_user_permissions(user_id: int) -> PermissionSet:
+        await rbac.ensure_loaded()
+        return rbac.get_permissions(user_id)
 
-        return permissions
+    @staticmethod
+    async def get_user_menus(user_id: int, include_hidden: bool = False) -> list[BunnyMenu]:
+        await rbac.ensure_loaded()
+        return rbac.get_menus(user_id, include_hidden)
@@ -0,0 +1,76 @@
+from typing import Iterable
+
+from .cache import async_bunny_cache
+from .config import BUNNY_CONFIG
+from .models import BunnyRole, BunnyUser, BunnyUserRole
+
+
+class UserProfile:
+    """
+    用户资料缓存
+
+    缓存 id、用户名、昵称、是否启用和角色名称，用于操作日志、用户信息和 token 验证，
+    修改用户或角色后需要调用 invalidate / invalidate_role
+    """
+
+    @staticmethod
+    def key(user_id: int) -> str:
+        return f'bunny:user:profile:{user_id}'
+
+    @staticmethod
+    async def get(user_id: int) -> dict | None:
+        """
+        获取用户资料
+
+        Args:
+            user_id: 用户 ID
+
+        Returns:
+            用户资料，用户不存在时返回 None
+        """
+        return await async_bunny_cache.get_or_set(
+            UserProfile.key(user_id),
+            lambda: UserProfile.load(user_id),
+            BUNNY_CONFIG.user_profile_ttl or None,
+            # 数据库中不存在的用户同样短暂缓存，避免其 token 每次请求都查询数据库
+            none_ttl=BUNNY_CONFIG.user_profile_none_ttl or None,
+        )
+
+    @staticmethod
+    async def load(user_id: int) -> dict | None:
+        """从数据库读取用户资料"""
+        user = await BunnyUser.get_or_none(id=user_id)
+
+        if not user:
+            return None
+
+        if user.id == 1:
+            roles = ['超级管理员']
+        else:
+            # 与权限快照一样直接读取 bunny_user_roles
+            role_ids = await BunnyUserRole.filter(user_id=user_id).values_list('role_id', flat=True)
+            roles = await BunnyRole.filter(id__in=role_ids).values_list('name', flat=True)
+
+        return {
+            'id': user.id,
+            'username': user.username,
+            'nickname': user.nickname,
+            # 已删除的用户同样视为禁用
+            'is_active': user.is_active and not user.is_deleted,
+            'roles': list(roles),
+        }
+
+    @staticmethod
+    async def invalidate(user_ids: Iterable[int]) -> None:
+        """删除用户资料缓存，所有 worker 中的内存缓存同时失效"""
+        keys = [UserProfile.key(user_id) for user_id in user_ids]
+
+        if keys:
+            await async_bunny_cache.delete_many(keys)
+
+    @staticmethod
+    async def invalidate_role(role_id: int) -> None:
+        """删除拥有该角色的用户的资料缓存，用于修改角色名称"""
+        user_ids = await BunnyUserRole.filter(role_id=role_id).values_list('user_id', flat=True)
+
+        await UserProfile.invalidate(user_ids)
@@ -0,0 +1,390 @@
+import asyncio
+import time
+from typing import Any, Callable, Iterable, Iterator
+
+from fastapi.logger import logger
+
+from .cache import AsyncBunnyCache, async_bunny_cache
+from .config import BUNNY_CONFIG
+from .models import BunnyRolePermission, BunnyUserRole
+from .models.bunny import BunnyMenu
+
+
+class PermissionRegistry:
+    """
+    权限字符串与整数 ID 的映射
+
+    ID 按加入顺序分配，删除的权限不会复用 ID，全量加载时重新分配
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self.names: list[str | None] = []
+        self.ids: dict[str, int] = {}
+        self.all_mask = 0  # 所有有效权限的位图
+
+        for name in names:
+            self.add(name)
+
+    def __contains__(self, permission: str) -> bool:
+        return permission in self.ids
+
+    def add(self, permission: str) -> int:
+        """加入权限，返回权限 ID"""
+        i = self.ids.get(permission)
+        if i is None:
+            i = self.ids[permission] = len(self.names)
+            self.names.append(permission)
+            self.all_mask |= 1 << i
+        return i
+
+    def remove(self, permission: str) -> int | None:
+        """移除权限，返回原来的权限 ID"""
+        i = self.ids.pop(permission, None)
+        if i is not None:
+            self.names[i] = None
+            self.all_mask &= ~(1 << i)
+        return i
+
+    def mask(self, permissions: Iterable[str]) -> int | None:
+        """
+        将权限列表转换为位图
+
+        Returns:
+            位图，存在未知的权限时返回 None
+        """
+        mask = 0
+
+        for permission in permissions:
+            i = self.ids.get(permission)
+            if i is None:
+                return None
+            mask |= 1 << i
+
+        return mask
+
+    def encode(self, permissions: Iterable[str]) -> int:
+        """将权限列表转换为位图，忽略未知的权限"""
+        mask = 0
+
+        for permission in permissions:
+            i = self.ids.get(permission)
+            if i is not None:
+                mask |= 1 << i
+
+        return mask
+
+
+class PermissionSet:
+    """用户的权限集合，以位图保存权限 ID"""
+
+    __slots__ = ('registry', 'mask')
+
+    def __init__(self, registry: PermissionRegistry, mask: int = 0):
+        self.registry = registry
+        self.mask = mask
+
+    def __contains__(self, permission: str) -> bool:
+        i = self.registry.ids.get(permission)
+        return i is not None and (self.mask >> i) & 1 == 1
+
+    def __iter__(self) -> Iterator[str]:
+        # 逐位运算大整数的开销与位数成正比，转换为二进制字符串只需要一次
+        names = self.registry.names
+        return (names[i] for i, bit in enumerate(reversed(bin(self.mask)[2:])) if bit == '1')
+
+    def __len__(self) -> int:
+        return self.mask.bit_count()
+
+    def has_all(self, permissions: Iterable[str]) -> bool:
+        """是否拥有全部权限，存在未知的权限时返回 False"""
+        required = self.registry.mask(permissions)
+        return required is not None and self.mask & required == required
+
+    def has_any(self, permissions: Iterable[str]) -> bool:
+        """是否拥有任意一个权限"""
+        return self.mask & self.registry.encode(permissions) != 0
+
+
+class RBAC:
+    """
+    进程内的 RBAC 快照
+
+    启动时一次性加载用户→角色、角色→权限和菜单，权限检查和用户菜单不再访问数据库，
+    用户的权限为其所有角色权限的并集。
+    写入数据库后调用 invalidate_role / invalidate_user / invalidate_menus，
+    所有 worker 只从数据库重新读取变更的条目；订阅中断重连后全量重新加载
+    """
+
+    def __init__(self, cache: AsyncBunnyCache | None = None, reload_interval: float = 0):
+        """
+        初始化 RBAC 快照
+
+        Args:
+            cache: 多级缓存实例，用于广播增量变更，默认为全局的 async_bunny_cache
+            reload_interval: 定期全量重新加载的间隔（秒），用于同步绕过服务直接修改的数据，
+                为 0 时不重新加载
+        """
+        self.cache = cache or async_bunny_cache
+        self.reload_interval = reload_interval
+
+        self.registry = PermissionRegistry()
+        self.role_masks: dict[int, int] = {}  # 角色 ID -> 权限位图
+        self.user_roles: dict[int, tuple[int, ...]] = {}  # 用户 ID -> 角色 ID
+        self.menus: dict[int, BunnyMenu] = {}
+        self.menu_order: list[tuple[int, BunnyMenu]] = []  # 按 sort、id 排序的 (权限位, 菜单)
+
+        self.loaded_at: float | None = None
+        self._load_lock = asyncio.Lock()
+        self._pending: list[tuple[Callable, Any]] | None = None  # 加载期间收到的增量变更
+        self._versions: dict[tuple[str, int], int] = {}  # 正在重新读取的条目的版本
+        self._tasks: set[asyncio.Task] = set()
+
+        self.cache.on_message('rbac:role', self._on_role)
+        self.cache.on_message('rbac:user', self._on_user)
+        self.cache.on_message('rbac:menu', self._on_menu)
+        self.cache.on_message('rbac:reload', self._on_reload)
+        self.cache.on_message('reset', self._on_reload)
+
+    async def load(self) -> None:
+        """从数据库全量加载快照"""
+        async with self._load_lock:
+            await self._load()
+
+    async def _load(self) -> None:
+        self._pending = []
+        try:
+            menus = await BunnyMenu.all()
+            role_permissions = await BunnyRolePermission.all().values_list('role_id', 'permission')
+            user_roles = await BunnyUserRole.all().values_list('user_id', 'role_id')
+        finally:
+            pending, self._pending = self._pending, None
+
+        self.build(menus, role_permissions, user_roles)
+
+        # 查询期间的变更可能没有包含在查询结果中，重新读取一次
+        for reload, arg in pending:
+            await reload(arg)
+
+    def build(
+        self,
+        menus: Iterable[BunnyMenu],
+        role_permissions: Iterable[tuple[int, str]],
+        user_roles: Iterable[tuple[int, int]],
+    ) -> None:
+        """
+        由数据库记录构建快照
+
+        Args:
+            menus: 所有菜单
+            role_permissions: (角色 ID, 权限) 列表
+            user_roles: (用户 ID, 角色 ID) 列表
+        """
+        menus = sorted(menus, key=lambda menu: menu.id)
+        registry = PermissionRegistry(menu.permission for menu in menus)
+
+        role_masks: dict[int, int] = {}
+        for role_id, permission in role_permissions:
+            i = registry.ids.get(permission)
+            if i is not None:
+                role_masks[role_id] = role_masks.get(role_id, 0) | (1 << i)
+
+        roles: dict[int, list[int]] = {}
+        for user_id, role_id in user_roles:
+            roles.setdefault(user_id, []).append(role_id)
+
+        # 一次性替换，检查权限时不会看到构建到一半的快照
+        self.registry = registry
+        self.role_masks = role_masks
+        self.user_roles = {user_id: tuple(role_ids) for user_id, role_ids in roles.items()}
+        self.menus = {menu.id: menu for menu in menus}
+        self._sort_menus()
+        self.loaded_at = time.monotonic()
+
+    async def ensure_loaded(self) -> None:
+        """确保快照已经加载，超过重新加载间隔时在后台重新加载"""
+        if self.loaded_at is None:
+            # 启动时加载失败的情况下，同时到达的请求只加载一次
+            async with self._load_lock:
+                if self.loaded_at is None:
+                    await self._load()
+        elif (
+            self.reload_interval > 0
+            and time.monotonic() - self.loaded_at > self.reload_interval
+            and not self._load_lock.locked()
+        ):
+            # 在重新加载完成之前继续使用当前快照，同时避免重复触发
+            self.loaded_at = time.monotonic()
+            self._spawn(self.load())
+
+    def get_permissions(self, user_id: int) -> PermissionSet:
+        """获取用户的权限集合，超级管理员拥有所有权限"""
+        if user_id == 1:
+            return PermissionSet(self.registry, self.registry.all_mask)
+
+        mask = 0
+        for role_id in self.user_roles.get(user_id, ()):
+            mask |= self.role_masks.get(role_id, 0)
+
+        return PermissionSet(self.registry, mask)
+
+    def get_menus(self, user_id: int, include_hidden: bool = False) -> list[BunnyMenu]:
+        """获取用户可见的菜单，按 sort、id 排序"""
+        mask = self.get_permissions(user_id).mask
+
+        return [
+            menu
+            for bit, menu in self.menu_order
+            if mask & bit and (include_hidden or not menu.hidden)
+        ]
+
+    async def invalidate_role(self, role_id: int) -> None:
+        """
+        角色已创建、修改或删除，所有 worker 从数据库重新读取该角色的权限
+
+        Args:
+            role_id: 角色 ID
+        """
+        await self._reload_role(role_id)
+        await self.cache.broadcast('rbac:role', role_id=role_id)
+
+    async def invalidate_user(self, user_id: int) -> None:
+        """
+        用户的角色已变更，所有 worker 从数据库重新读取该用户的角色
+
+        Args:
+            user_id: 用户 ID
+        """
+        await self._reload_user(user_id)
+        await self.cache.broadcast('rbac:user', user_id=user_id)
+
+    async def invalidate_menus(self, ids: list[int]) -> None:
+        """
+        菜单已创建、修改或删除，所有 worker 从数据库重新读取这些菜单
+
+        Args:
+            ids: 菜单 ID 列表
+        """
+        await self._reload_menus(ids)
+        await self.cache.broadcast('rbac:menu', ids=ids)
+
+    async def reload_all(self) -> None:
+        """通知所有 worker 全量重新加载"""
+        await self.load()
+        await self.cache.broadcast('rbac:reload')
+
+    async def _reload_role(self, role_id: int) -> None:
+        """从数据库重新读取角色的权限"""
+        version = self._begin('role', role_id, self._reload_role)
+
+        permissions = await BunnyRolePermission.filter(role_id=role_id).values_list(
+            'permission', flat=True
+        )
+
+        if not self._end('role', role_id, version):
+            return
+
+        # 没有权限的角色不保存，删除角色时由调用方通过 invalidate_user 移除用户的角色
+        if permissions:
+            self.role_masks[role_id] = self.registry.encode(permissions)
+        else:
+            self.role_masks.pop(role_id, None)
+
+    async def _reload_user(self, user_id: int) -> None:
+        """从数据库重新读取用户的角色"""
+        version = self._begin('user', user_id, self._reload_user)
+
+        role_ids = await BunnyUserRole.filter(user_id=user_id).values_list('role_id', flat=True)
+
+        if not self._end('user', user_id, version):
+            return
+
+        if role_ids:
+            self.user_roles[user_id] = tuple(role_ids)
+        else:
+            self.user_roles.pop(user_id, None)
+
+    def _begin(self, type: str, id: int, reload: Callable) -> int:
+        """开始重新读取条目，返回本次读取的版本"""
+        if self._pending is not None:
+            self._pending.append((reload, id))
+
+        version = self._versions.get((type, id), 0) + 1
+        self._versions[(type, id)] = version
+
+        return version
+
+    def _end(self, type: str, id: int, version: int) -> bool:
+        """结束重新读取条目，同一条目有更晚开始的读取时丢弃本次结果"""
+        if self._versions.get((type, id)) != version:
+            return False
+
+        del self._versions[(type, id)]
+        return True
+
+    async def _reload_menus(self, ids: list[int]) -> None:
+        """从数据库重新读取菜单并更新权限映射"""
+        if self._pending is not None:
+            self._pending.append((self._reload_menus, ids))
+
+        menus = {menu.id: menu for menu in await BunnyMenu.filter(id__in=ids)}
+        # 角色可以在菜单创建之前保存权限字符串，新增或修改的权限需要合并已有的角色权限
+        role_permissions = await BunnyRolePermission.filter(
+            permission__in={menu.permission for menu in menus.values()}
+        ).values_list('role_id', 'permission')
+        removed = 0
+
+        for id in ids:
+            old = self.menus.pop(id, None)
+            new = menus.get(id)
+
+            if old is not None and (new is None or new.permission != old.permission):
+                # 角色中保存的是权限字符串，修改后的权限不再匹配原有的角色权限
+                i = self.registry.remove(old.permission)
+                if i is not None:
+                    removed |= 1 << i
+
+            if new is not None:
+                self.registry.add(new.permission)
+                self.menus[id] = new
+
+        if removed:
+            for role_id, mask in self.role_masks.items():
+                self.role_masks[role_id] = mask & ~removed
+
+        for role_id, permission in role_permissions:
+            i = self.registry.ids.get(permission)
+            if i is not None:
+                self.role_masks[role_id] = self.role_masks.get(role_id, 0) | (1 << i)
+
+        self._sort_menus()
+
+    def _sort_menus(self) -> None:
+        menus = sorted(self.menus.values(), key=lambda menu: (menu.sort, menu.id))
+        self.menu_order = [(1 << self.registry.ids[menu.permission], menu) for menu in menus]
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f'RBAC 快照更新失败: {task.exception()}')
+
+    def _on_role(self, message: dict) -> None:
+        self._spawn(self._reload_role(message['role_id']))
+
+    def _on_user(self, message: dict) -> None:
+        self._spawn(self._reload_user(message['user_id']))
+
+    def _on_menu(self, message: dict) -> None:
+        self._spawn(self._reload_menus(message['ids']))
+
+    def _on_reload(self, message: dict) -> None:
+        # 可能漏掉了其他 worker 的增量变更，重新从数据库加载
+        if self.loaded_at is not None:
+            self._spawn(self.load())
+
+
+rbac = RBAC(reload_interval=BUNNY_CONFIG.rbac_reload_interval)
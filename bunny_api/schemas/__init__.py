@@ -1,4 +1,4 @@
-from .auth import UserLogin, ResetPassword
+from .auth import UserLogin, ResetPassword, RefreshToken
 from .base import PaginationParams, PaginationSchema, ResponseSchema
 from .menu import MenuParams
 from .role import RoleParams
@@ -6,6 +6,7 @@ from .role import RoleParams
 __all__ = [
     'UserLogin',
     'ResetPassword',
+    'RefreshToken',
     'PaginationParams',
     'PaginationSchema',
     'ResponseSchema',
@@ -9,3 +9,7 @@ class UserLogin(BaseModel):
 class ResetPassword(BaseModel):
     old_password: str = Field(description='旧密码', min_length=8, max_length=32)
     password: str = Field(description='新密码', min_length=8, max_length=32)
+
+
+class RefreshToken(BaseModel):
+    refresh_token: str = Field(description='refresh token', min_length=1, max_length=256)
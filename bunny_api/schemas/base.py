@@ -1,4 +1,4 @@
-from typing import Any, Generic, List, Optional, TypeVar
+from typing import Any, Generic, List, Literal, Optional, TypeVar
 
 from pydantic import BaseModel, Field
 
@@ -16,6 +16,15 @@ class ResponseSchema(BaseModel, Generic[T]):
 class PaginationParams(BaseModel):
     page: int = Field(default=1, ge=1)
     limit: int = Field(default=10, ge=1, le=1000)
+    # offset: 按页码分页; cursor: 按上一页返回的游标分页，深分页不会变慢
+    mode: Literal['offset', 'cursor'] = 'offset'
+    cursor: Optional[str] = Field(default=None, max_length=512)
+    # 总数的计算方式 exact / cached / estimated / none，为空时由接口决定
+    count: Optional[Literal['exact', 'cached', 'estimated', 'none']] = None
+
+    @property
+    def use_cursor(self) -> bool:
+        return self.mode == 'cursor' or self.cursor is not None
 
     @property
     def offset(self) -> int:
@@ -24,4 +33,7 @@ class PaginationParams(BaseModel):
 
 class PaginationSchema(BaseModel):
     list: List[Any]
-    total: int
+    total: Optional[int] = None  # 不计算总数时为空
+    has_more: Optional[bool] = None  # 是否还有下一页
+    next_cursor: Optional[str] = None  # 游标分页时下一页的游标，没有下一页时为空
+    prev_cursor: Optional[str] = None  # 游标分页时上一页的游标，没有上一页时为空
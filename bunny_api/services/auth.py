@@ -2,7 +2,8 @@ import time
 
 from ..exceptions import BunnyException
 from ..models import BunnyUser
-from ..schemas import ResetPassword, UserLogin
+from ..profile import UserProfile
+from ..schemas import RefreshToken, ResetPassword, UserLogin
 from ..token import admin_bunny_token
 from ..utils import bcrypt_pwd, verify_bcrypt_pwd
 
@@ -21,17 +22,24 @@ class AuthService:
         if not user.is_active:
             raise BunnyException('用户已被禁用')
 
-        token = admin_bunny_token.generate(user.id)
+        if admin_bunny_token.refresh_expires_delta is not None:
+            token = await admin_bunny_token.generate_pair(user.id)
+        else:
+            token = {'token': await admin_bunny_token.generate(user.id)}
 
         await BunnyUser.filter(id=user.id).update(
             last_login_ip=real_ip, last_login_time=int(time.time())
         )
 
-        return {'token': token}
+        return token
+
+    @staticmethod
+    async def refresh(refresh_token: RefreshToken) -> dict:
+        return await admin_bunny_token.refresh(refresh_token.refresh_token)
 
     @staticmethod
     async def logout(token: str) -> None:
-        if not admin_bunny_token.ban(token):
+        if not await admin_bunny_token.ban(token):
             raise BunnyException('退出失败')
 
     @staticmethod
@@ -45,15 +53,19 @@ class AuthService:
 
         await user.save()
 
+        # 修改密码后撤销该用户所有已签发的 token
+        await admin_bunny_token.revoke_all(user_id)
+
     @staticmethod
     async def get_user_info(user_id: int) -> dict:
-        user = await BunnyUser.get(id=user_id).prefetch_related('roles')
+        profile = await UserProfile.get(user_id)
 
-        roles = ['超级管理员'] if user_id == 1 else [role.name for role in user.roles]
+        if not profile:
+            raise BunnyException('用户不存在')
 
         return {
-            'id': user.id,
-            'username': user.username,
-            'nickname': user.nickname,
-            'roles': roles,
+            'id': profile['id'],
+            'username': profile['username'],
+            'nickname': profile['nickname'],
+            'roles': profile['roles'],
         }
@@ -6,4 +6,21 @@ from ..utils import paginate
 class LogsService:
     @staticmethod
     async def list(params: PaginationParams) -> PaginationSchema:
-        return await paginate(BunnyOperationLog, params.page, params.limit)
+        # 日志表数据量大，count 比查询一页数据更慢，默认使用缓存的总数
+        count = params.count or 'cached'
+
+        if params.use_cursor:
+            # 按 id 倒序游标分页，最新的日志在前
+            return await paginate(
+                BunnyOperationLog,
+                params.page,
+                params.limit,
+                keyset=['-id'],
+                cursor=params.cursor,
+                count=count,
+            )
+
+        # 与游标分页使用相同的顺序
+        return await paginate(
+            BunnyOperationLog, params.page, params.limit, order_by='-id', count=count
+        )
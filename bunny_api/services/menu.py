@@ -26,9 +26,9 @@ class MenuService:
         if await BunnyMenu.filter(permission=menu.permission).exists():
             raise BunnyException('权限已存在')
 
-        await BunnyMenu.create(**menu.model_dump())
+        created = await BunnyMenu.create(**menu.model_dump())
 
-        Permission.refresh()
+        await Permission.invalidate_menus([created.id])
 
     @staticmethod
     async def update(id: int, menu: MenuParams) -> None:
@@ -55,7 +55,7 @@ class MenuService:
 
         await BunnyMenu.filter(id=id).update(**menu.model_dump())
 
-        Permission.refresh()
+        await Permission.invalidate_menus([id])
 
     @staticmethod
     async def delete(id: int) -> None:
@@ -73,7 +73,7 @@ class MenuService:
 
             await BunnyRolePermission.filter(permission__in=permissions).delete()
 
-        Permission.refresh()
+        await Permission.invalidate_menus(ids)
 
     @staticmethod
     async def get_all_children(id: int, visited: set | None = None) -> List[int]:
@@ -137,23 +137,9 @@ class MenuService:
 
     @staticmethod
     async def get_user_menu(user_id: int, handle: bool = True) -> List[dict]:
-        menus: List[BunnyMenu] = []
-
-        filters = {'hidden': False} if handle else {}
-
-        if user_id == 1:
-            menus = await BunnyMenu.filter(**filters).order_by('sort', 'id')
-        else:
-            permissions = await Permission.get_user_permissions(user_id, Permission.get_flag())
-
-            if permissions:
-                menus = (
-                    await BunnyMenu.filter(**filters)
-                    .filter(permission__in=permissions)
-                    .order_by('sort', 'id')
-                )
-
-        menus = MenuService.handle_menu_tree(menus, handle)
+        menus = MenuService.handle_menu_tree(
+            await Permission.get_user_menus(user_id, include_hidden=not handle), handle
+        )
 
         if handle:
             menus.insert(
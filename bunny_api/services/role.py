@@ -3,8 +3,9 @@ from typing import List
 from tortoise.transactions import in_transaction
 
 from ..exceptions import BunnyException
-from ..models.bunny import BunnyMenu, BunnyRole, BunnyRolePermission, BunnyUserRole
+from ..models.bunny import BunnyRole, BunnyRolePermission, BunnyUserRole
 from ..permission import Permission
+from ..profile import UserProfile
 from ..schemas import PaginationParams, PaginationSchema, RoleParams
 from ..utils import paginate
 
@@ -12,7 +13,19 @@ from ..utils import paginate
 class RoleService:
     @staticmethod
     async def list(params: PaginationParams) -> PaginationSchema:
-        return await paginate(BunnyRole, params.page, params.limit)
+        count = params.count or 'exact'
+
+        if params.use_cursor:
+            return await paginate(
+                BunnyRole,
+                params.page,
+                params.limit,
+                keyset=['id'],
+                cursor=params.cursor,
+                count=count,
+            )
+
+        return await paginate(BunnyRole, params.page, params.limit, order_by='id', count=count)
 
     @staticmethod
     async def detail(id: int) -> BunnyRole:
@@ -27,13 +40,12 @@ class RoleService:
     async def permission_check(permissions: List[str], user_id: int) -> List[str]:
         permissions = list(set(permissions))
 
-        if await BunnyMenu.filter(permission__in=permissions).count() != len(permissions):
+        registry = await Permission.get_registry()
+        if registry.mask(permissions) is None:
             raise BunnyException('存在未知的权限')
 
-        if user_id > 1:
-            for permission in permissions:
-                if not await Permission.check_permission(user_id, permission):
-                    raise BunnyException('权限越级')
+        if not await Permission.has_all(user_id, permissions):
+            raise BunnyException('权限越级')
 
         return permissions
 
@@ -53,7 +65,7 @@ class RoleService:
 
             await BunnyRolePermission.bulk_create(permission_list)
 
-        Permission.refresh()
+        await Permission.invalidate_role(role.id)
 
     @staticmethod
     async def update(id: int, role_params: RoleParams, user_id: int) -> None:
@@ -77,7 +89,8 @@ class RoleService:
 
             await BunnyRolePermission.bulk_create(permission_list)
 
-        Permission.refresh()
+        await Permission.invalidate_role(id)
+        await UserProfile.invalidate_role(id)
 
     @staticmethod
     async def delete(id: int, user_id: int) -> None:
@@ -85,9 +98,15 @@ class RoleService:
         if not await BunnyRole.filter(id=id, **filters).exists():
             raise BunnyException('角色不存在')
 
+        user_ids = await BunnyUserRole.filter(role_id=id).values_list('user_id', flat=True)
+
         async with in_transaction():
             await BunnyRole.filter(id=id).delete()
             await BunnyRolePermission.filter(role_id=id).delete()
             await BunnyUserRole.filter(role_id=id).delete()
 
-        Permission.refresh()
+        await Permission.invalidate_role(id)
+        # 从权限快照中移除用户的该角色，避免残留的角色 ID 在重新创建权限时生效
+        for uid in user_ids:
+            await Permission.invalidate_user(uid)
+        await UserProfile.invalidate(user_ids)
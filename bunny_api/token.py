@@ -1,29 +1,108 @@
+import asyncio
+import hmac
 import time
 from datetime import datetime, timedelta, timezone
-from hashlib import md5
+from hashlib import md5, sha256
+from secrets import token_urlsafe
 from uuid import uuid4
 
-from jwt import decode, encode
+from fastapi.logger import logger
 
-from .cache import bunny_cache
+from .cache import AsyncBunnyCache, async_bunny_cache
+from .cache.bloom import RotatingBloomFilter
+from .cache.memory import LRUStore
 from .config import BUNNY_CONFIG
-from .exceptions import AuthenticationError
+from .exceptions import AuthenticationError, CacheUnavailableError
+from .keyset import KeySet, load_key_set
+
+REVOCATION_LOCK_TIMEOUT = 3  # 更新撤销记录时跨进程锁的过期时间（秒）
+REVOCATION_RETRY_INTERVAL = 10  # 撤销记录布隆过滤器加载失败后重试的间隔（秒）
+REFRESH_REUSE_GRACE = 10  # 轮换后旧 refresh token 再次使用时不视为泄露的时间（秒），用于并发刷新
 
 
 class BunnyToken:
-    def __init__(self, secret_key: str, expires_delta: timedelta | None = None, sso: bool = False):
+    def __init__(
+        self,
+        secret_key: str,
+        expires_delta: timedelta | None = None,
+        sso: bool = False,
+        fail_open: bool = True,
+        cache_size: int = 10000,
+        revocation_capacity: int = 100000,
+        refresh_expires_delta: timedelta | None = None,
+        keys: KeySet | None = None,
+        cache: AsyncBunnyCache | None = None,
+    ):
         """
         使用 PyJWT 实现 token 的生成和解析
 
         Args:
-            secret_key: 密钥
+            secret_key: HS256 密钥，设置 keys 时忽略
             expires_delta: 过期时间，默认为 1 天
             sso: 是否为单点登录 token，默认为 False
+            fail_open: Redis 不可用、无法确认黑名单和 SSO 状态时是否放行，默认为 True
+            cache_size: 每个 worker 缓存的已验证 token 数量，为 0 时不缓存
+            revocation_capacity: 每个 worker 撤销记录布隆过滤器的容量，为 0 时每次都读取撤销记录
+            refresh_expires_delta: refresh token 有效期，设置后启用 refresh token 轮换，
+                此时 expires_delta 为短期 access token 的有效期，access token 只校验签名和过期时间
+            keys: 签名密钥集合，默认为使用 secret_key 的 HS256
+            cache: 多级缓存实例，默认为全局的 async_bunny_cache
         """
         self.secret_key = secret_key
         self.expires_delta = expires_delta or timedelta(days=1)
+        self.refresh_expires_delta = refresh_expires_delta
+        # 撤销记录需要覆盖 access token 和 refresh token 中较长的有效期
+        self.revocation_ttl = max(self.expires_delta, refresh_expires_delta or timedelta())
         self.sso = sso
-        self.algorithm = 'HS256'
+        self.fail_open = fail_open
+        self.keys = keys or KeySet(secret_key)
+        self.algorithm = self.keys.algorithm
+        self.cache = cache or async_bunny_cache
+
+        # 已验证的 token 载荷，key 为 token 摘要，在 token 过期时同时过期
+        self.verified: LRUStore | None = LRUStore(maxsize=cache_size) if cache_size > 0 else None
+
+        # 有撤销记录的用户 ID 的布隆过滤器，过滤器判断不存在时无需读取撤销记录，
+        # 调用 start 加载完成之前为空，此时所有用户都读取撤销记录
+        self.revocations: RotatingBloomFilter | None = None
+        self.revocation_capacity = revocation_capacity
+        self._rebuild_pending: list[str] | None = None  # 重建期间撤销的用户 ID
+        self._rebuild_task: asyncio.Task | None = None
+        self._rebuild_retry_at = 0.0
+
+        self.cache.on_message('token:revoke', self._on_revoke)
+        self.cache.on_message('reset', self._on_reset)
+
+    async def start(self) -> None:
+        """从 Redis 加载撤销记录，构建布隆过滤器"""
+        await self.rebuild_revocations()
+
+    async def rebuild_revocations(self) -> None:
+        """
+        通过 SCAN 读取 Redis 中仍然有效的撤销记录，重建布隆过滤器
+
+        撤销记录过期后不会从过滤器中删除，过滤器按 token 有效期轮换，元素过多时重建
+        """
+        if self.revocation_capacity <= 0:
+            return
+
+        self._rebuild_pending = []
+        try:
+            keys = await self.cache.scan_redis('bunny:token:revoked:*')
+        except Exception as e:
+            logger.error(f'token 撤销记录加载失败: {e}')
+            return
+        finally:
+            pending, self._rebuild_pending = self._rebuild_pending, None
+
+        revocations = RotatingBloomFilter(
+            max(self.revocation_capacity, 2 * len(keys)),
+            period=self.revocation_ttl.total_seconds(),
+        )
+        for user_id in [key.rsplit(':', 1)[1] for key in keys] + pending:
+            revocations.add(user_id)
+
+        self.revocations = revocations
 
     def get_cache_key(self, key: int | str, type: str = 'token') -> str:
         """
@@ -38,11 +117,15 @@ class BunnyToken:
         """
 
         if isinstance(key, str):
-            key = md5(key.encode()).hexdigest()
+            key = self.get_digest(key)
 
         return f'bunny:{type}:{key}'
 
-    def generate(self, user_id: int) -> str:
+    def get_digest(self, token: str) -> str:
+        """获取 token 摘要"""
+        return md5(token.encode()).hexdigest()
+
+    async def generate(self, user_id: int) -> str:
         """
         生成 token
 
@@ -52,53 +135,182 @@ class BunnyToken:
         Returns:
             token
         """
-        to_encode = {'user_id': user_id, 'exp': datetime.now(timezone.utc) + self.expires_delta}
+        to_encode = {
+            'user_id': user_id,
+            'jti': uuid4().hex,
+            'iat': time.time(),
+            'exp': datetime.now(timezone.utc) + self.expires_delta,
+        }
 
         if self.sso:
             uuid = str(uuid4())
             to_encode.update({'sso': uuid})
             cache_key = self.get_cache_key(user_id)
-            bunny_cache.set_redis(cache_key, uuid, self.expires_delta.total_seconds())
+            await self.cache.set_redis(cache_key, uuid, int(self.expires_delta.total_seconds()))
 
-        return encode(to_encode, self.secret_key, algorithm=self.algorithm)
+        return self.keys.sign(to_encode)
 
-    def verify(self, token: str) -> int:
+    async def generate_pair(self, user_id: int) -> dict:
         """
-        验证 token
+        生成短期 access token 和 refresh token，需要启用 refresh token
+
+        同一次登录轮换出的 refresh token 属于同一个 token 族，记录保存在 Redis 中，
+        只在刷新时读取，access token 的验证不访问 Redis
 
         Args:
-            token: token
+            user_id: 用户 ID
 
         Returns:
-            user_id
+            {'token': access token, 'refresh_token': refresh token, 'expires_in': 有效秒数}
         """
+        if self.refresh_expires_delta is None:
+            raise RuntimeError('refresh token 未启用')
 
-        try:
-            payload = decode(token, self.secret_key, algorithms=[self.algorithm])
-        except Exception:
+        record = {'user_id': user_id, 'iat': time.time()}
+
+        if self.sso:
+            record['sso'] = str(uuid4())
+            cache_key = self.get_cache_key(user_id)
+            ttl = int(self.refresh_expires_delta.total_seconds())
+            await self.cache.set_redis(cache_key, record['sso'], ttl)
+
+        return await self._rotate(uuid4().hex, record)
+
+    async def refresh(self, refresh_token: str) -> dict:
+        """
+        使用 refresh token 换取新的 access token 和 refresh token
+
+        旧的 refresh token 随即失效，已轮换的 refresh token 再次使用时视为泄露，撤销整个 token 族
+
+        Args:
+            refresh_token: refresh token
+
+        Returns:
+            同 generate_pair
+        """
+        if self.refresh_expires_delta is None:
             raise AuthenticationError()
 
-        if 'user_id' not in payload:
+        family, _, secret = refresh_token.partition('.')
+        if not family or not secret:
             raise AuthenticationError()
 
-        blacklist_cache_key = self.get_cache_key(token, 'token:blacklist')
-        if bunny_cache.get_redis(blacklist_cache_key):
+        cache_key = self.get_refresh_key(family)
+
+        async with self.cache.lock(cache_key, REVOCATION_LOCK_TIMEOUT):
+            record = await self.cache.get_redis(cache_key)
+            if not record:
+                raise AuthenticationError()
+
+            digest = sha256(secret.encode()).hexdigest()
+            if not hmac.compare_digest(digest, record['hash']):
+                # 并发刷新时后到的请求会使用刚被轮换的旧 token，只拒绝不撤销
+                if not (
+                    hmac.compare_digest(digest, record.get('previous') or '')
+                    and time.time() - record['rotated_at'] < REFRESH_REUSE_GRACE
+                ):
+                    await self.cache.delete_redis(cache_key)
+                raise AuthenticationError()
+
+            user_id: int = record['user_id']
+            revocation = await self._get_revocation(user_id)
+
+            if revocation and record['iat'] < revocation['epoch']:
+                await self.cache.delete_redis(cache_key)
+                raise AuthenticationError()
+
+            if (
+                self.sso
+                and await self.cache.get_redis(self.get_cache_key(user_id)) != record['sso']
+            ):
+                await self.cache.delete_redis(cache_key)
+                raise AuthenticationError()
+
+            return await self._rotate(family, record)
+
+    def get_refresh_key(self, family: str) -> str:
+        """获取 token 族的缓存 key"""
+        return f'bunny:token:refresh:{family}'
+
+    async def _rotate(self, family: str, record: dict) -> dict:
+        """为 token 族生成新的 refresh token 和 access token"""
+        # token 族的有效期从登录时开始计算，轮换不会延长
+        ttl = int(record['iat'] + self.refresh_expires_delta.total_seconds() - time.time())
+        if ttl <= 0:
             raise AuthenticationError()
 
+        secret = token_urlsafe(32)
+        record['previous'] = record.get('hash')
+        record['hash'] = sha256(secret.encode()).hexdigest()
+        record['rotated_at'] = time.time()
+        await self.cache.set_redis(self.get_refresh_key(family), record, ttl)
+
+        to_encode = {
+            'user_id': record['user_id'],
+            'jti': uuid4().hex,
+            'iat': time.time(),
+            'exp': datetime.now(timezone.utc) + self.expires_delta,
+            'fam': family,
+        }
+        if self.sso:
+            to_encode['sso'] = record['sso']
+
+        return {
+            'token': self.keys.sign(to_encode),
+            'refresh_token': f'{family}.{secret}',
+            'expires_in': int(self.expires_delta.total_seconds()),
+        }
+
+    async def verify(self, token: str) -> int:
+        """
+        验证 token
+
+        Args:
+            token: token
+
+        Returns:
+            user_id
+        """
+
+        digest = self.get_digest(token)
+
+        # 同一个 token 会被反复使用，验证过的载荷直接复用，跳过签名校验和声明解析
+        payload = self.verified.get(digest) if self.verified is not None else None
+        if payload is None:
+            payload = self._decode(token)
+            if self.verified is not None:
+                self.verified.set(digest, payload, payload['exp'] - time.time())
+
         user_id: int = payload['user_id']
 
-        if self.sso:
-            if 'sso' not in payload:
-                raise AuthenticationError()
+        # 短期 access token 不检查撤销记录和 SSO 标识，这些状态在刷新时检查
+        if 'fam' in payload and self.refresh_expires_delta is not None:
+            return user_id
 
-            cache_value = bunny_cache.get_redis(self.get_cache_key(user_id))
+        try:
+            if 'jti' in payload:
+                # 绝大多数用户没有撤销记录，布隆过滤器判断可能存在时才读取，撤销记录会缓存在内存中
+                if self._maybe_revoked(user_id) and self._is_revoked(
+                    payload, await self._get_revocation(user_id)
+                ):
+                    raise AuthenticationError()
+            elif await self.cache.contains(f'bunny:token:blacklist:{digest}'):
+                # 兼容升级前签发的没有 jti 的 token，一个 token 有效期后可以移除
+                raise AuthenticationError()
 
-            if not cache_value or cache_value != payload['sso']:
+            # SSO 标识在其他设备登录时会被覆盖，始终以 Redis 为准
+            if self.sso:
+                sso = await self.cache.get_redis(self.get_cache_key(user_id))
+                if sso != payload['sso']:
+                    raise AuthenticationError()
+        except CacheUnavailableError:
+            # 熔断期间直接失败，不等待 Redis 超时
+            if not self.fail_open:
                 raise AuthenticationError()
 
         return user_id
 
-    def ban(self, token: str) -> bool:
+    async def ban(self, token: str) -> bool:
         """
         禁用 token
 
@@ -110,26 +322,198 @@ class BunnyToken:
         """
 
         try:
-            payload = decode(token, self.secret_key, algorithms=[self.algorithm])
+            payload = self.keys.decode(token)
             user_id: int = payload['user_id']
-            ttl: int = payload['exp'] - int(time.time())
-            cache_key = self.get_cache_key(token, 'token:blacklist')
-            bunny_cache.set_redis(cache_key, user_id, ttl)
-            return True
+            digest = self.get_digest(token)
+
+            if 'fam' in payload:
+                # access token 很快过期，撤销 token 族使其无法再刷新
+                await self.cache.delete_redis(self.get_refresh_key(payload['fam']))
+            elif 'jti' in payload:
+                await self._update_revocation(user_id, jti=payload['jti'], exp=payload['exp'])
+            else:
+                ttl: int = payload['exp'] - int(time.time())
+                await self.cache.set_redis(f'bunny:token:blacklist:{digest}', user_id, ttl)
         except Exception:
             return False
 
+        # 通知所有 worker 淘汰已验证的载荷并加入布隆过滤器
+        self._revoked(user_id, digest)
+        await self.cache.broadcast('token:revoke', user_id=user_id, digest=digest)
+
+        return True
+
+    async def revoke_all(self, user_id: int) -> None:
+        """
+        撤销用户在此之前签发的所有 token
+
+        Args:
+            user_id: 用户 ID
+        """
+        await self._update_revocation(user_id, epoch=time.time())
+
+        self._revoked(user_id)
+        await self.cache.broadcast('token:revoke', user_id=user_id)
+
+    async def _update_revocation(
+        self,
+        user_id: int,
+        jti: str | None = None,
+        exp: float | None = None,
+        epoch: float | None = None,
+    ) -> None:
+        """
+        更新用户的撤销记录
+
+        撤销记录为 {'epoch': 时间戳, 'jti': {jti: 过期时间}}，
+        签发时间早于 epoch 的 token 和列出的 jti 都已失效。
+        记录中的 token 都会在一个有效期内过期，因此记录本身也只保留一个有效期，
+        启用 refresh token 时为 refresh token 的有效期
+        """
+        cache_key = self.get_cache_key(user_id, 'token:revoked')
+
+        async with self.cache.lock(cache_key, REVOCATION_LOCK_TIMEOUT):
+            record = await self.cache.get_redis(cache_key) or {'epoch': 0, 'jti': {}}
+            now = time.time()
+            jtis = {k: v for k, v in record['jti'].items() if v > now}
+
+            if epoch is not None:
+                # 已撤销的 jti 都签发于 epoch 之前，无需继续保留
+                record['epoch'] = epoch
+                jtis = {}
+
+            if jti is not None:
+                jtis[jti] = exp
+
+            record['jti'] = jtis
+
+            # 写入后会通过消息总线淘汰其他 worker 内存中的旧记录
+            await self.cache.set(cache_key, record, int(self.revocation_ttl.total_seconds()))
+
+    async def _get_revocation(self, user_id: int) -> dict | None:
+        """
+        读取用户的撤销记录
+
+        Raises:
+            CacheUnavailableError: 内存未命中且 Redis 不可用，由调用方按 fail_open 处理
+        """
+        # get 在 Redis 不可用时返回默认值，无法区分没有撤销记录，这里必须让异常抛出
+        cache_key = self.get_cache_key(user_id, 'token:revoked')
+        found, record = await self.cache.get_with_status(cache_key)
+
+        return record if found else None
+
+    def _is_revoked(self, payload: dict, record: dict | None) -> bool:
+        if not record:
+            return False
+
+        return payload.get('iat', 0) < record['epoch'] or payload['jti'] in record['jti']
+
+    def _decode(self, token: str) -> dict:
+        """校验签名并解析载荷"""
+        try:
+            payload = self.keys.decode(token)
+        except Exception:
+            raise AuthenticationError()
+
+        if 'user_id' not in payload or 'exp' not in payload:
+            raise AuthenticationError()
+
+        if self.sso and 'sso' not in payload:
+            raise AuthenticationError()
+
+        return payload
+
+    def _maybe_revoked(self, user_id: int) -> bool:
+        """用户是否可能有撤销记录"""
+        if self.revocations is None:
+            self._schedule_rebuild()
+            return True
+
+        if self.revocations.saturated:
+            self._schedule_rebuild()
+
+        return str(user_id) in self.revocations
+
+    def _schedule_rebuild(self) -> None:
+        """在后台重建撤销记录的布隆过滤器"""
+        if self.revocation_capacity <= 0 or self._rebuild_task is not None:
+            return
+
+        now = time.monotonic()
+        if now < self._rebuild_retry_at:
+            return
+
+        self._rebuild_retry_at = now + REVOCATION_RETRY_INTERVAL
+        self._rebuild_task = asyncio.create_task(self.rebuild_revocations())
+        self._rebuild_task.add_done_callback(self._rebuild_done)
+
+    def _rebuild_done(self, task: asyncio.Task) -> None:
+        self._rebuild_task = None
+
+    def _revoked(self, user_id: int, digest: str | None = None) -> None:
+        if self.verified is not None and digest is not None:
+            self.verified.pop(digest)
+
+        if self.revocations is not None:
+            self.revocations.add(str(user_id))
+
+        if self._rebuild_pending is not None:
+            self._rebuild_pending.append(str(user_id))
+
+    def _on_revoke(self, message: dict) -> None:
+        self._revoked(message['user_id'], message.get('digest'))
+
+    def _on_reset(self, message: dict) -> None:
+        # 订阅中断期间可能漏掉了其他 worker 的撤销消息，重新从 Redis 加载
+        if self.verified is not None:
+            self.verified.clear()
+
+        if self.revocations is not None:
+            self.revocations = None
+            self._rebuild_retry_at = 0.0
+            self._schedule_rebuild()
+
 
 def get_bunny_token(
     secret_key: str,
     expires_delta: timedelta | None = None,
     sso: bool = False,
+    fail_open: bool = True,
+    cache_size: int = 10000,
+    revocation_capacity: int = 100000,
+    refresh_expires_delta: timedelta | None = None,
+    keys: KeySet | None = None,
 ) -> BunnyToken:
-    return BunnyToken(secret_key, expires_delta, sso)
+    return BunnyToken(
+        secret_key,
+        expires_delta,
+        sso,
+        fail_open,
+        cache_size,
+        revocation_capacity,
+        refresh_expires_delta,
+        keys,
+    )
 
 
 admin_bunny_token = get_bunny_token(
     secret_key=BUNNY_CONFIG.admin_token_secret_key,
-    expires_delta=timedelta(seconds=BUNNY_CONFIG.admin_token_expires_seconds),
+    expires_delta=timedelta(
+        seconds=BUNNY_CONFIG.admin_token_access_expires_seconds
+        if BUNNY_CONFIG.admin_token_refresh_expires_seconds > 0
+        else BUNNY_CONFIG.admin_token_expires_seconds
+    ),
     sso=BUNNY_CONFIG.admin_token_sso,
+    fail_open=BUNNY_CONFIG.admin_token_fail_open,
+    cache_size=BUNNY_CONFIG.admin_token_cache_size,
+    revocation_capacity=BUNNY_CONFIG.admin_token_revocation_capacity,
+    refresh_expires_delta=timedelta(seconds=BUNNY_CONFIG.admin_token_refresh_expires_seconds)
+    if BUNNY_CONFIG.admin_token_refresh_expires_seconds > 0
+    else None,
+    keys=load_key_set(
+        BUNNY_CONFIG.admin_token_secret_key,
+        BUNNY_CONFIG.admin_token_private_key_file,
+        BUNNY_CONFIG.admin_token_public_key_files,
+    ),
 )
@@ -1,9 +1,20 @@
+import base64
+import hashlib
+import json
+from datetime import datetime
 from functools import lru_cache
-from typing import List, Type
+from typing import Any, List, Literal, Type
 
 import bcrypt
 from fastapi import Request
+from fastapi.logger import logger
+from tortoise import fields
+from tortoise.expressions import Q
+from tortoise.queryset import QuerySet
 
+from .cache import async_bunny_cache
+from .config import BUNNY_CONFIG
+from .exceptions import BunnyException
 from .models.base import BaseModel
 from .schemas import PaginationSchema
 
@@ -36,6 +47,9 @@ def str2list(s: str, sep: str = ',') -> List[str]:
     return [item.strip() for item in s.split(sep) if item.strip()]
 
 
+CountStrategy = Literal['exact', 'cached', 'estimated', 'none']
+
+
 async def paginate(
     model: Type[BaseModel],
     page: int,
@@ -43,6 +57,9 @@ async def paginate(
     related: list[str] | None = None,
     filters: dict | None = None,
     order_by: str | list[str] | None = None,
+    keyset: list[str] | None = None,
+    cursor: str | None = None,
+    count: CountStrategy = 'exact',
 ) -> PaginationSchema:
     """
     通用的分页查询函数
@@ -51,6 +68,10 @@ async def paginate(
         query: Tortoise ORM 的 QuerySet 对象
         page: 页码，从 1 开始
         limit: 每页数据量
+        keyset: 游标分页的排序字段，例如 ['-created_at', '-id']，最后一个字段必须唯一，
+            指定时忽略 page 和 order_by，按游标分页
+        cursor: 上一次返回的 next_cursor 或 prev_cursor，为空时返回第一页
+        count: 总数据量的计算方式，见 count_total，为 none 时不计算总数，只返回 has_more
 
     Returns:
         PaginationSchema: 包含当前页的数据列表和总数据量
@@ -63,15 +84,222 @@ async def paginate(
     if related:
         query = query.prefetch_related(*related)
 
-    total = await query.count()
+    total = await count_total(model, query, filters, count)
+
+    if keyset:
+        return await keyset_paginate(model, query, limit, keyset, cursor, total)
 
     if order_by:
         if isinstance(order_by, str):
             order_by = [order_by]
         query = query.order_by(*order_by)
 
-    query = query.offset(offset).limit(limit)
+    # 多取一条判断是否还有下一页
+    query = query.offset(offset).limit(limit + 1)
+
+    items = (await model.get_pydantic_queryset_model().from_queryset(query)).model_dump()
+
+    return PaginationSchema(list=items[:limit], total=total, has_more=len(items) > limit)
+
+
+async def count_total(
+    model: Type[BaseModel], query: QuerySet, filters: dict | None, strategy: CountStrategy
+) -> int | None:
+    """
+    计算分页的总数据量
+
+    Args:
+        model: 模型类
+        query: 已经应用过滤条件的 QuerySet
+        filters: 过滤条件，用于生成缓存 key
+        strategy: exact: 每次 count;
+            cached: 缓存 count 结果 pagination_count_cache_ttl 秒，按模型和过滤条件区分;
+            estimated: 使用数据库统计信息估算，MySQL 读取 information_schema / EXPLAIN，
+                PostgreSQL 读取 reltuples / EXPLAIN，其他数据库或估算失败时使用 cached;
+            none: 不计算
+
+    Returns:
+        总数据量，strategy 为 none 时返回 None
+    """
+    if strategy == 'none':
+        return None
+
+    if strategy == 'estimated':
+        estimated = await _estimate_count(model, query, filters)
+        if estimated is not None:
+            return estimated
+
+        strategy = 'cached'
+
+    if strategy == 'cached' and BUNNY_CONFIG.pagination_count_cache_ttl > 0:
+        digest = hashlib.sha1(
+            json.dumps(filters or {}, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+        return await async_bunny_cache.get_or_set(
+            f'bunny:paginate:count:{model._meta.db_table}:{digest}',
+            query.count,
+            BUNNY_CONFIG.pagination_count_cache_ttl,
+        )
+
+    return await query.count()
+
+
+async def _estimate_count(
+    model: Type[BaseModel], query: QuerySet, filters: dict | None
+) -> int | None:
+    """使用数据库统计信息估算行数，不支持的数据库或统计信息不可用时返回 None"""
+    db = model._meta.db
+    dialect = db.capabilities.dialect
+    table = model._meta.db_table
+
+    try:
+        if dialect == 'mysql':
+            if not filters:
+                rows = await db.execute_query_dict(
+                    'SELECT TABLE_ROWS AS count FROM information_schema.TABLES '
+                    'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s',
+                    [table],
+                )
+                return int(rows[0]['count']) if rows and rows[0]['count'] is not None else None
+
+            rows = await db.execute_query_dict(f'EXPLAIN {query.sql(params_inline=True)}')
+            return int(rows[0]['rows']) if rows and rows[0].get('rows') is not None else None
+
+        if dialect == 'postgres':
+            if not filters:
+                rows = await db.execute_query_dict(
+                    'SELECT reltuples::bigint AS count FROM pg_class WHERE relname = $1', [table]
+                )
+                # 从未 ANALYZE 的表 reltuples 为 -1
+                return int(rows[0]['count']) if rows and rows[0]['count'] >= 0 else None
+
+            rows = await db.execute_query_dict(
+                f'EXPLAIN (FORMAT JSON) {query.sql(params_inline=True)}'
+            )
+            plan = rows[0]['QUERY PLAN']
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows'])
+    except Exception as e:
+        logger.warning(f'估算 {table} 行数失败: {e}')
+
+    return None
+
+
+async def keyset_paginate(
+    model: Type[BaseModel],
+    query: QuerySet,
+    limit: int,
+    keyset: list[str],
+    cursor: str | None,
+    total: int,
+) -> PaginationSchema:
+    """
+    游标分页，使用上一页边界行的排序字段值作为条件，查询耗时与页码无关
+
+    Args:
+        model: 模型类
+        query: 已经应用过滤条件的 QuerySet
+        limit: 每页数据量
+        keyset: 排序字段，'-' 开头表示倒序
+        cursor: 游标，为空时返回第一页
+        total: 总数据量
+
+    Returns:
+        PaginationSchema: 包含当前页的数据列表、总数据量和前后页的游标
+    """
+    values, backward = decode_cursor(model, keyset, cursor) if cursor else (None, False)
+
+    order = [_reverse_order(key) for key in keyset] if backward else keyset
+    if values is not None:
+        query = query.filter(_keyset_condition(order, values))
+
+    # 多取一条判断是否还有数据
+    query = query.order_by(*order).limit(limit + 1)
+    items = (await model.get_pydantic_queryset_model().from_queryset(query)).model_dump()
+
+    has_more = len(items) > limit
+    items = items[:limit]
+    if backward:
+        items.reverse()
+
+    next_cursor = None
+    prev_cursor = None
+    if items:
+        # 向后翻页时多取的一条决定是否有下一页，向前翻页时决定是否有上一页
+        if has_more or backward:
+            next_cursor = encode_cursor(keyset, items[-1], False)
+        if (has_more and backward) or (values is not None and not backward):
+            prev_cursor = encode_cursor(keyset, items[0], True)
+
+    return PaginationSchema(
+        list=items,
+        total=total,
+        has_more=next_cursor is not None,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
+    )
+
+
+def encode_cursor(keyset: list[str], item: dict, backward: bool) -> str:
+    """将边界行的排序字段值编码为游标"""
+    values = [item[key.lstrip('-')] for key in keyset]
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+
+    data = json.dumps([1 if backward else 0, values], separators=(',', ':'))
+
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(model: Type[BaseModel], keyset: list[str], cursor: str) -> tuple[list, bool]:
+    """
+    解析游标
+
+    Returns:
+        (排序字段值, 是否向前翻页)
+
+    Raises:
+        BunnyException: 游标格式错误或与排序字段不匹配
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        backward, values = json.loads(data)
+
+        if len(values) != len(keyset):
+            raise ValueError(cursor)
+
+        fields_map = model._meta.fields_map
+        values = [
+            datetime.fromisoformat(value)
+            if isinstance(fields_map[key.lstrip('-')], fields.DatetimeField)
+            else value
+            for key, value in zip(keyset, values)
+        ]
+    except Exception:
+        raise BunnyException('分页游标无效')
+
+    return values, bool(backward)
+
+
+def _reverse_order(key: str) -> str:
+    return key[1:] if key.startswith('-') else f'-{key}'
+
+
+def _keyset_condition(order: list[str], values: list[Any]) -> Q:
+    """
+    生成排在边界行之后的条件
+
+    例如 order 为 ['-created_at', '-id'] 时生成
+    created_at < v1 OR (created_at = v1 AND id < v2)
+    """
+    conditions = []
+
+    for i, key in enumerate(order):
+        name = key.lstrip('-')
+        op = 'lt' if key.startswith('-') else 'gt'
 
-    items = await model.get_pydantic_queryset_model().from_queryset(query)
+        equals = {order[j].lstrip('-'): values[j] for j in range(i)}
+        conditions.append(Q(**equals, **{f'{name}__{op}': values[i]}))
 
-    return PaginationSchema(list=items.model_dump(), total=total)
+    return Q(*conditions, join_type='OR')
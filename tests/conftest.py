@@ -0,0 +1,68 @@
+import os
+
+# 导入 bunny_api 之前补齐 BunnyConfig 必填的配置，测试不连接真实的数据库和 Redis
+for _key, _value in {
+    'DB_HOST': 'localhost',
+    'DB_PORT': '3306',
+    'DB_USER': 'test',
+    'DB_PASSWORD': 'test',
+    'DB_NAME': 'test',
+    'ADMIN_TOKEN_SECRET_KEY': 'test-secret',
+}.items():
+    os.environ.setdefault(_key, _value)
+
+import fakeredis  # noqa: E402
+import pytest  # noqa: E402
+from tortoise import Tortoise  # noqa: E402
+
+from bunny_api.cache import AsyncBunnyCache, CircuitBreaker, LocalInvalidationBus  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.fixture
+def redis_server():
+    """fakeredis 服务端，设置 connected = False 模拟 Redis 不可用"""
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def bus():
+    return LocalInvalidationBus()
+
+
+@pytest.fixture
+async def make_cache(redis_server, bus):
+    """
+    创建共享同一个 Redis 和消息总线的缓存，每个缓存相当于一个 worker
+    """
+    caches = []
+
+    async def make() -> AsyncBunnyCache:
+        cache = AsyncBunnyCache(
+            fakeredis.FakeAsyncRedis(server=redis_server),
+            bus=bus,
+            breaker=CircuitBreaker(failure_threshold=100, recovery_timeout=60),
+        )
+        await cache.start()
+        caches.append(cache)
+        return cache
+
+    yield make
+
+    for cache in caches:
+        await cache.close()
+
+
+@pytest.fixture
+async def db():
+    """SQLite 内存数据库"""
+    await Tortoise.init(db_url='sqlite://:memory:', modules={'models': ['bunny_api.models.bunny']})
+    await Tortoise.generate_schemas()
+
+    yield
+
+    await Tortoise.close_connections()
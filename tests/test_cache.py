@@ -0,0 +1,60 @@
+import fakeredis
+import pytest
+
+from bunny_api.cache import AsyncBunnyCache, CircuitBreaker, RedisInvalidationBus
+from bunny_api.cache.metrics import CacheMetrics
+from bunny_api.exceptions import CacheUnavailableError
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_broadcast_skipped_while_breaker_open(redis_server):
+    redis_client = fakeredis.FakeAsyncRedis(server=redis_server)
+    metrics = CacheMetrics()
+    cache = AsyncBunnyCache(
+        redis_client,
+        bus=RedisInvalidationBus(redis_client),
+        breaker=CircuitBreaker(failure_threshold=1, recovery_timeout=60, metrics=metrics),
+        metrics=metrics,
+    )
+
+    redis_server.connected = False
+    with pytest.raises(CacheUnavailableError):
+        await cache.set('profile:user:1', 'a')
+    assert cache.redis_cache.breaker.is_open
+
+    await cache.broadcast('rbac', version=1)
+
+    assert metrics.counters[('bus', 'skip', 'rbac')] == 1
+    assert ('bus', 'error', 'rbac') not in metrics.counters
+    await cache.close()
+
+
+async def test_failed_set_leaves_no_local_value(make_cache, redis_server):
+    cache = await make_cache()
+    await cache.set('profile:user:1', 'old')
+
+    redis_server.connected = False
+    with pytest.raises(CacheUnavailableError):
+        await cache.set('profile:user:1', 'new')
+    with pytest.raises(CacheUnavailableError):
+        await cache.set_many({'profile:user:2': 'new'})
+
+    assert cache.get_memory('profile:user:1') is None
+    assert cache.get_memory('profile:user:2') is None
+
+    redis_server.connected = True
+    assert await cache.get_redis('profile:user:1') == 'old'
+
+
+async def test_pipeline_applies_memory_in_order(make_cache):
+    cache = await make_cache()
+
+    async with cache.pipeline() as pipe:
+        pipe.set('profile:user:1', 'a')
+        pipe.delete('profile:user:1')
+        pipe.set('profile:user:2', 'b')
+
+    assert cache.get_memory('profile:user:1') is None
+    assert cache.get_memory('profile:user:2') == 'b'
+    assert await cache.get('profile:user:1') is None
@@ -0,0 +1,147 @@
+import json
+import multiprocessing
+import os
+
+import pytest
+from tortoise import timezone
+
+from bunny_api.log_queue import OperationLogQueue
+from bunny_api.models.bunny import BunnyOperationLog
+
+pytestmark = pytest.mark.anyio
+
+
+def make_record(i: int) -> dict:
+    return dict(
+        user_id=0,
+        username='',
+        nickname='',
+        path='/admin/role',
+        route='role.create',
+        method='POST',
+        ip='127.0.0.1',
+        content={'i': i, 'padding': 'x' * 2000},
+        is_success=True,
+        created_at=timezone.localtime(),
+    )
+
+
+async def logged_ids() -> list[int]:
+    return [
+        content['i'] for content in await BunnyOperationLog.all().values_list('content', flat=True)
+    ]
+
+
+async def test_batches_and_drains_on_close(db, tmp_path):
+    queue = OperationLogQueue(
+        batch_size=10, flush_interval=0.01, spill_path=str(tmp_path / 'spill')
+    )
+    await queue.start()
+
+    for i in range(25):
+        await queue.put(make_record(i))
+    await queue.close()
+
+    assert sorted(await logged_ids()) == list(range(25))
+
+
+async def test_failed_flush_spills_and_replays(db, tmp_path, monkeypatch):
+    spill = str(tmp_path / 'spill')
+    queue = OperationLogQueue(batch_size=10, flush_interval=0.01, spill_path=spill)
+
+    async def fail(*args, **kwargs):
+        raise RuntimeError('db down')
+
+    with monkeypatch.context() as m:
+        m.setattr(BunnyOperationLog, 'bulk_create', fail)
+        await queue.start()
+        for i in range(15):
+            await queue.put(make_record(i))
+        await queue.close()
+
+    assert queue.spilled == 15
+    assert await logged_ids() == []
+
+    await OperationLogQueue(batch_size=10, spill_path=spill).replay()
+
+    assert sorted(await logged_ids()) == list(range(15))
+    assert not os.path.exists(spill)
+
+
+async def test_replay_failure_does_not_duplicate(db, tmp_path, monkeypatch):
+    spill = str(tmp_path / 'spill')
+    queue = OperationLogQueue(batch_size=10, spill_path=spill)
+    queue._write_spill([make_record(i) for i in range(25)])
+
+    bulk_create = BunnyOperationLog.bulk_create
+    calls = 0
+
+    async def fail_second(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise RuntimeError('db down')
+        return await bulk_create(*args, **kwargs)
+
+    with monkeypatch.context() as m:
+        m.setattr(BunnyOperationLog, 'bulk_create', fail_second)
+        await queue.replay()
+
+    assert len(await logged_ids()) == 10
+
+    await queue.replay()
+
+    assert sorted(await logged_ids()) == list(range(25))
+
+
+async def test_corrupt_line_moved_to_bad_file(db, tmp_path):
+    spill = str(tmp_path / 'spill')
+    queue = OperationLogQueue(batch_size=10, spill_path=spill)
+    queue._write_spill([make_record(i) for i in range(3)])
+    with open(spill, 'a', encoding='utf-8') as f:
+        f.write('{"user_id": 0, "trunc\n')
+    queue._write_spill([make_record(i) for i in range(3, 5)])
+
+    await queue.replay()
+
+    assert sorted(await logged_ids()) == list(range(5))
+    with open(f'{spill}.bad', encoding='utf-8') as f:
+        assert f.read() == '{"user_id": 0, "trunc\n'
+
+
+async def test_replay_adopts_files_of_exited_process(db, tmp_path):
+    spill = str(tmp_path / 'spill')
+    queue = OperationLogQueue(spill_path=spill)
+    queue._write_spill([make_record(i) for i in range(3)])
+
+    # 模拟回放中途退出的进程遗留的文件
+    process = multiprocessing.get_context('fork').Process(target=os._exit, args=(0,))
+    process.start()
+    process.join()
+    os.replace(spill, f'{spill}.replay.{process.pid}.1')
+
+    await queue.replay()
+
+    assert sorted(await logged_ids()) == list(range(3))
+    assert not os.path.exists(f'{spill}.replay.{process.pid}.1')
+
+
+def append_spill(spill: str, start: int) -> None:
+    queue = OperationLogQueue(spill_path=spill)
+    for i in range(start, start + 200):
+        queue._write_spill([make_record(i)])
+
+
+def test_concurrent_appends_from_processes(tmp_path):
+    spill = str(tmp_path / 'spill')
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=append_spill, args=(spill, i * 200)) for i in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    with open(spill, encoding='utf-8') as f:
+        ids = [json.loads(line)['content']['i'] for line in f]
+
+    assert sorted(ids) == list(range(800))
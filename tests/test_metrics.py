@@ -0,0 +1,61 @@
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from bunny_api.api import metricsRouter
+from bunny_api.cache.metrics import CacheMetrics
+from bunny_api.config import BUNNY_CONFIG
+from bunny_api.exceptions import BunnyException, bunny_exception_handler
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_exception_handler(BunnyException, bunny_exception_handler)
+    app.include_router(metricsRouter)
+    return TestClient(app)
+
+
+def test_render_prometheus_with_worker_label():
+    metrics = CacheMetrics()
+    metrics.incr('redis', 'hit', 'profile:user:1')
+
+    text = metrics.render_prometheus({'bunny_cache_memory_entries': 1}, worker='42')
+
+    assert (
+        'bunny_cache_events_total{tier="redis",event="hit",prefix="profile:user",worker="42"} 1'
+        in text
+    )
+    assert 'bunny_cache_memory_entries{worker="42"} 1' in text
+
+
+def test_metrics_disabled_by_default(client, monkeypatch):
+    monkeypatch.setattr(BUNNY_CONFIG, 'cache_metrics_token', '')
+    monkeypatch.setattr(BUNNY_CONFIG, 'cache_metrics_allow_ips', '')
+
+    assert 'Bunny-Error' in client.get('/admin/cache/metrics').headers
+
+
+def test_metrics_token(client, monkeypatch):
+    monkeypatch.setattr(BUNNY_CONFIG, 'cache_metrics_token', 'scrape-token')
+    monkeypatch.setattr(BUNNY_CONFIG, 'cache_metrics_allow_ips', '')
+
+    response = client.get('/admin/cache/metrics', headers={'Authorization': 'Bearer wrong'})
+    assert 'Bunny-Error' in response.headers
+
+    response = client.get('/admin/cache/metrics', headers={'Authorization': 'Bearer scrape-token'})
+    assert response.status_code == 200
+    assert f'worker="{os.getpid()}"' in response.text
+
+
+def test_metrics_allow_ips(client, monkeypatch):
+    monkeypatch.setattr(BUNNY_CONFIG, 'cache_metrics_token', '')
+    monkeypatch.setattr(BUNNY_CONFIG, 'cache_metrics_allow_ips', '10.0.0.1')
+
+    response = client.get('/admin/cache/metrics', headers={'X-Real-IP': '10.0.0.1'})
+    assert 'Bunny-Error' in response.headers
+
+    monkeypatch.setattr(BUNNY_CONFIG, 'cache_metrics_allow_ips', '10.0.0.1,testclient')
+    assert client.get('/admin/cache/metrics').status_code == 200
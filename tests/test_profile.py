@@ -0,0 +1,46 @@
+import pytest
+
+from bunny_api import profile
+from bunny_api.profile import UserProfile
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_missing_user_is_cached(make_cache, monkeypatch):
+    worker_a = await make_cache()
+    worker_b = await make_cache()
+    loads = []
+
+    async def load(user_id):
+        loads.append(user_id)
+        return None
+
+    monkeypatch.setattr(UserProfile, 'load', load)
+
+    monkeypatch.setattr(profile, 'async_bunny_cache', worker_a)
+    assert await UserProfile.get(404) is None
+    assert await UserProfile.get(404) is None
+
+    # 其他 worker 从 Redis 读到缓存的 None
+    monkeypatch.setattr(profile, 'async_bunny_cache', worker_b)
+    assert await UserProfile.get(404) is None
+
+    assert loads == [404]
+    assert 0 < await worker_a.redis_cache.redis_client.ttl(UserProfile.key(404)) <= 60
+
+
+async def test_missing_user_not_cached_when_disabled(make_cache, monkeypatch):
+    loads = []
+
+    async def load(user_id):
+        loads.append(user_id)
+        return None
+
+    monkeypatch.setattr(UserProfile, 'load', load)
+    monkeypatch.setattr(profile, 'async_bunny_cache', await make_cache())
+    monkeypatch.setattr(profile.BUNNY_CONFIG, 'user_profile_none_ttl', 0)
+
+    assert await UserProfile.get(404) is None
+    assert await UserProfile.get(404) is None
+
+    assert loads == [404, 404]
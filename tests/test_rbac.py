@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from bunny_api.models import BunnyRolePermission, BunnyUserRole
+from bunny_api.models.bunny import BunnyMenu, BunnyRole, BunnyUser
+from bunny_api.rbac import RBAC
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_menu(permission: str) -> BunnyMenu:
+    return await BunnyMenu.create(
+        parent_id=0, title=permission, path=f'/{permission}', permission=permission
+    )
+
+
+@pytest.fixture
+async def workers(db, make_cache):
+    """两个共享数据库和消息总线的 worker"""
+    user = await BunnyUser.create(username='admin', nickname='admin', password='')
+    role = await BunnyRole.create(name='editor', creator=user)
+    await BunnyUserRole.create(user_id=2, role_id=role.id)
+    await create_menu('role.list')
+    await create_menu('role.create')
+    await BunnyRolePermission.create(role=role, permission='role.list')
+
+    rbacs = [RBAC(cache=await make_cache()), RBAC(cache=await make_cache())]
+    for rbac in rbacs:
+        await rbac.load()
+
+    yield role, rbacs
+
+
+async def settle() -> None:
+    # 等待消息总线投递消息以及后台的重新读取完成
+    for _ in range(5):
+        await asyncio.sleep(0.01)
+
+
+async def test_role_change_reaches_other_worker(workers):
+    role, (worker_a, worker_b) = workers
+    assert set(worker_b.get_permissions(2)) == {'role.list'}
+
+    await BunnyRolePermission.create(role=role, permission='role.create')
+    await worker_a.invalidate_role(role.id)
+    await settle()
+
+    assert set(worker_a.get_permissions(2)) == {'role.list', 'role.create'}
+    assert set(worker_b.get_permissions(2)) == {'role.list', 'role.create'}
+
+
+async def test_user_roles_change_reaches_other_worker(workers):
+    role, (worker_a, worker_b) = workers
+
+    await BunnyUserRole.filter(user_id=2).delete()
+    await worker_a.invalidate_user(2)
+    await settle()
+
+    assert len(worker_b.get_permissions(2)) == 0
+
+
+async def test_new_menu_picks_up_existing_role_permissions(workers):
+    role, (worker_a, worker_b) = workers
+
+    # 角色先保存了权限，菜单之后才创建
+    await BunnyRolePermission.create(role=role, permission='menu.list')
+    await worker_a.invalidate_role(role.id)
+    await settle()
+    assert 'menu.list' not in worker_b.get_permissions(2)
+
+    menu = await create_menu('menu.list')
+    await worker_a.invalidate_menus([menu.id])
+    await settle()
+
+    for rbac in (worker_a, worker_b):
+        assert 'menu.list' in rbac.get_permissions(2)
+        assert menu in rbac.get_menus(2)
+
+
+async def test_menu_permission_change(workers):
+    role, (worker_a, worker_b) = workers
+    menu = await BunnyMenu.get(permission='role.list')
+
+    menu.permission = 'role.index'
+    await menu.save()
+    await worker_a.invalidate_menus([menu.id])
+    await settle()
+
+    for rbac in (worker_a, worker_b):
+        assert len(rbac.get_permissions(2)) == 0
+
+    await BunnyRolePermission.filter(role=role).update(permission='role.index')
+    await worker_a.invalidate_role(role.id)
+    await settle()
+
+    assert set(worker_b.get_permissions(2)) == {'role.index'}
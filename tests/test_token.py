@@ -0,0 +1,133 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from bunny_api import token
+from bunny_api.exceptions import AuthenticationError, CacheUnavailableError
+from bunny_api.token import BunnyToken
+
+pytestmark = pytest.mark.anyio
+
+SECRET = 'test-secret-key-with-at-least-32-bytes'
+
+
+def make_token(cache, **kwargs) -> BunnyToken:
+    return BunnyToken(SECRET, timedelta(hours=1), cache=cache, **kwargs)
+
+
+async def test_ban_revokes_on_other_workers(make_cache):
+    worker_a = make_token(await make_cache())
+    worker_b = make_token(await make_cache())
+    await worker_a.start()
+    await worker_b.start()
+
+    token = await worker_a.generate(2)
+    assert await worker_b.verify(token) == 2
+
+    assert await worker_a.ban(token)
+    # 等待消息总线把撤销消息投递给 worker_b
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(AuthenticationError):
+        await worker_b.verify(token)
+
+
+async def test_revoke_all(make_cache):
+    bunny_token = make_token(await make_cache())
+    await bunny_token.start()
+
+    old = await bunny_token.generate(2)
+    await bunny_token.revoke_all(2)
+    new = await bunny_token.generate(2)
+
+    with pytest.raises(AuthenticationError):
+        await bunny_token.verify(old)
+    assert await bunny_token.verify(new) == 2
+
+
+@pytest.mark.parametrize('fail_open', [False, True])
+async def test_revoked_token_when_redis_down(make_cache, redis_server, fail_open):
+    worker_a = make_token(await make_cache(), fail_open=fail_open)
+    token = await worker_a.generate(2)
+    assert await worker_a.ban(token)
+
+    # 另一个 worker 内存中没有撤销记录，只能读取 Redis
+    worker_b = make_token(await make_cache(), fail_open=fail_open, cache_size=0)
+    await worker_b.start()
+
+    redis_server.connected = False
+
+    if fail_open:
+        assert await worker_b.verify(token) == 2
+    else:
+        with pytest.raises(AuthenticationError):
+            await worker_b.verify(token)
+
+
+def make_refresh_token(cache, **kwargs) -> BunnyToken:
+    return BunnyToken(
+        SECRET,
+        timedelta(minutes=5),
+        cache=cache,
+        refresh_expires_delta=timedelta(days=1),
+        **kwargs,
+    )
+
+
+async def test_refresh_rotation(make_cache):
+    bunny_token = make_refresh_token(await make_cache())
+    await bunny_token.start()
+
+    pair = await bunny_token.generate_pair(2)
+    assert await bunny_token.verify(pair['token']) == 2
+
+    rotated = await bunny_token.refresh(pair['refresh_token'])
+    assert rotated['refresh_token'] != pair['refresh_token']
+    assert await bunny_token.verify(rotated['token']) == 2
+
+    # 并发刷新时刚被轮换的旧 token 只被拒绝，不影响新 token
+    with pytest.raises(AuthenticationError):
+        await bunny_token.refresh(pair['refresh_token'])
+    assert await bunny_token.refresh(rotated['refresh_token'])
+
+
+async def test_refresh_reuse_revokes_family(make_cache, monkeypatch):
+    monkeypatch.setattr(token, 'REFRESH_REUSE_GRACE', 0)
+    bunny_token = make_refresh_token(await make_cache())
+    await bunny_token.start()
+
+    pair = await bunny_token.generate_pair(2)
+    rotated = await bunny_token.refresh(pair['refresh_token'])
+
+    with pytest.raises(AuthenticationError):
+        await bunny_token.refresh(pair['refresh_token'])
+
+    # 旧 token 被重放后整个 token 族失效
+    with pytest.raises(AuthenticationError):
+        await bunny_token.refresh(rotated['refresh_token'])
+
+    # 其他登录的 token 族不受影响
+    assert await bunny_token.refresh((await bunny_token.generate_pair(2))['refresh_token'])
+
+
+async def test_refresh_after_revoke_all(make_cache):
+    bunny_token = make_refresh_token(await make_cache())
+    await bunny_token.start()
+
+    pair = await bunny_token.generate_pair(2)
+    await bunny_token.revoke_all(2)
+
+    with pytest.raises(AuthenticationError):
+        await bunny_token.refresh(pair['refresh_token'])
+
+
+async def test_refresh_fails_closed_when_redis_down(make_cache, redis_server):
+    bunny_token = make_refresh_token(await make_cache(), fail_open=True)
+    await bunny_token.start()
+
+    pair = await bunny_token.generate_pair(2)
+    redis_server.connected = False
+
+    with pytest.raises(CacheUnavailableError):
+        await bunny_token.refresh(pair['refresh_token'])